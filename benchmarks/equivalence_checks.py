@@ -0,0 +1,277 @@
+import argparse
+import random
+import sys
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from benchmarks.synthetic_documents import SyntheticDocumentSpec, generate_document
+from src.application.services.line_processor_service import LineProcessorService
+from src.application.services.paged_line_extractor_service import extract_page_lines
+from src.application.services.token_matcher_service import TokenMatcherService
+from src.domain.models.document import BoundingBox, ColumnSpecification
+from src.domain.models.output import OrderedFieldMap
+from src.domain.models.token_table import TokenTable
+from src.infrastructure.parsers.document_template_parser import DocumentTemplateParserImpl
+from src.infrastructure.parsers.ocr_data_parser import OCRDataParserImpl
+from src.utils.reading_order import BATCH_CLUSTERING_MIN_TOKENS, iter_sorted_rows, sort_indices_by_y
+from src.utils.token_utils import join_texts_smartly
+
+
+# Each optimized routine is compared with a plain copy of the implementation it replaced:
+# the linear token scan, sequential row clustering, the quadratic join and the multi-pass merge
+JOIN_TEXTS = ["Invoice", "INV-1234", "&", "$", "1,234.56", "-", "(", "[", "ref", ")", "]", ",", ".", "%", "/", "", "Ltd", "Co."]
+CELL_TEXTS = [
+    "", "  ", None, "INV12345", "12/03/2024", "$1,200.00", "abc", "Smith &", "cont", "foo,", "bar-", "x...", "a",
+    "long description", "ref:", "x/", "12.5", "USD 4", "(cont)", "po 5", "&", "...", " continued", "+", "a b \\", "5 ,x"
+]
+DOCUMENT_SIZES = [200, 2000, 20000]
+
+
+def reference_tokens_in_boxes(tokens: TokenTable, boxes: Sequence[BoundingBox]) -> List[int]:
+    result = []
+    for i in range(len(tokens)):
+        mid_x, mid_y = tokens.mid_x[i], tokens.mid_y[i]
+        for box in boxes:
+            if mid_x >= box.x0 and mid_x <= box.x1 and mid_y >= box.y0 and mid_y <= box.y1:
+                result.append(i)
+                break
+    return result
+
+
+def reference_sorted_rows(sorted_tokens: List[int], tokens: TokenTable, row_tolerance: float) -> List[List[int]]:
+    if not sorted_tokens:
+        return []
+    rows = []
+    current_row = [sorted_tokens[0]]
+    average_y = tokens.mid_y[sorted_tokens[0]]
+    for token in sorted_tokens[1:]:
+        token_y = tokens.mid_y[token]
+        if abs(token_y - average_y) <= row_tolerance:
+            current_row.append(token)
+            average_y = (average_y * (len(current_row) - 1) + token_y) / len(current_row)
+        else:
+            rows.append(current_row)
+            current_row = [token]
+            average_y = token_y
+    rows.append(current_row)
+    return rows
+
+
+def reference_join(texts: List[str]) -> str:
+    if not texts:
+        return ""
+    result_parts = [texts[0]]
+    for text in texts[1:]:
+        previous_text = "".join(result_parts)
+        if text in [",", ".", ":", ";", ")", "]", "%", "-", "/", "&"] or previous_text.endswith("(") or previous_text.endswith("["):
+            result_parts.append(text)
+        else:
+            result_parts.append(" ")
+            result_parts.append(text)
+    return "".join(result_parts).replace("$ ", "$").replace(" - ", "-").strip()
+
+
+def reference_merge(lines: List[OrderedFieldMap], columns: Sequence[ColumnSpecification]) -> List[OrderedFieldMap]:
+    if len(lines) <= 1:
+        return lines
+    
+    merged = []
+    current_line = None
+    continuation_lines = []
+    for line in lines:
+        if current_line is not None and _reference_is_continuation(current_line, line, columns):
+            continuation_lines.append(line)
+            continue
+        if current_line is not None:
+            merged.append(_reference_merge_content(current_line, continuation_lines, columns) if continuation_lines else current_line)
+        current_line = line
+        continuation_lines = []
+    if current_line is not None:
+        merged.append(_reference_merge_content(current_line, continuation_lines, columns) if continuation_lines else current_line)
+    return merged
+
+
+def _reference_is_continuation(current_line: OrderedFieldMap, next_line: OrderedFieldMap, columns: Sequence[ColumnSpecification]) -> bool:
+    def count_non_empty(line: OrderedFieldMap) -> int:
+        return sum(1 for value in line.values.values() if value and value.strip())
+    
+    if count_non_empty(next_line) >= count_non_empty(current_line):
+        return False
+    
+    structured = 0
+    for column in columns:
+        value = next_line.values.get(column.canonical)
+        if value and _reference_is_structured(value.strip()):
+            structured += 1
+    return structured <= 1
+
+
+def _reference_is_structured(text: str) -> bool:
+    if not text:
+        return False
+    has_digit = any(c.isdigit() for c in text)
+    single_word = len(text.split()) == 1
+    is_date = "/" in text or ("-" in text and has_digit) or ("." in text and single_word)
+    is_currency = (any(symbol in text for symbol in "$¢€£¥") or any(code in text for code in ["USD", "AUD", "NZD", "CAD"])
+                   or (has_digit and ("." in text or "," in text)))
+    is_reference = has_digit and (any(prefix in text.upper() for prefix in ["INV", "PO", "REF", "IV"]) or len(text) >= 6)
+    return is_date or is_currency or is_reference or (single_word and len(text) >= 3)
+
+
+def _reference_merge_content(current_line: OrderedFieldMap, continuations: List[OrderedFieldMap], columns: Sequence[ColumnSpecification]) -> OrderedFieldMap:
+    values = dict(current_line.values)
+    for continuation_line in continuations:
+        for column in columns:
+            key = column.canonical
+            current_value = values.get(key)
+            continuation_value = continuation_line.values.get(key)
+            if current_value and continuation_value:
+                current_text = current_value.strip()
+                continuation_text = continuation_value.strip()
+                if continuation_text:
+                    values[key] = _reference_merge_text(current_text, continuation_text).strip() or None
+            elif not current_value and continuation_value:
+                values[key] = continuation_value
+    return OrderedFieldMap(keys=current_line.keys, values=values)
+
+
+def _reference_merge_text(current: str, continuation: str) -> str:
+    if current.endswith("&"):
+        return current[:-1] + " " + continuation
+    if current.endswith(",") or current.endswith("-"):
+        return current + continuation
+    if current.endswith(".."):
+        return current.rstrip(".") + " " + continuation
+    if current.endswith(";") or current.endswith(":"):
+        return current + " " + continuation
+    if current.endswith("\\") or current.endswith("/") or current.endswith("+"):
+        return current[:-1] + " " + continuation
+    for marker in ["cont", "continued", "(cont)"]:
+        if current.endswith(marker):
+            return current[:-len(marker)].strip() + " " + continuation
+    return current + " " + continuation
+
+
+def random_token_table(rng: random.Random, token_count: int, row_count: int) -> TokenTable:
+    # Tokens sit on jittered rows, with some on the page edges and outside it
+    tokens = TokenTable()
+    for _ in range(token_count):
+        y = rng.randrange(row_count) / row_count + rng.uniform(-0.004, 0.004)
+        x = rng.choice([0.0, 1.0, rng.uniform(-0.05, 1.05), rng.random()])
+        tokens.append("t", x, y, x + rng.uniform(0, 0.05), y + rng.uniform(0, 0.01))
+    return tokens
+
+
+def random_box(rng: random.Random) -> BoundingBox:
+    x0, x1 = sorted(rng.uniform(-0.1, 1.1) for _ in range(2))
+    y0, y1 = sorted(rng.uniform(-0.1, 1.1) for _ in range(2))
+    return BoundingBox(x0, y0, x1, y1)
+
+
+def random_lines(rng: random.Random) -> Tuple[List[OrderedFieldMap], List[ColumnSpecification]]:
+    # Repeated canonical names are allowed, as a template may map two columns to one field
+    names = [f"c{rng.randint(0, 5)}" for _ in range(rng.randint(1, 6))]
+    columns = [ColumnSpecification(name, name, (0.0, 0.0, 1.0, 1.0)) for name in names]
+    keys = tuple(names)
+    lines = []
+    for _ in range(rng.randint(0, 12)):
+        values = {name: rng.choice(CELL_TEXTS) for name in names if rng.random() < 0.8}
+        lines.append(OrderedFieldMap(keys=keys, values=values))
+    return lines, columns
+
+
+def synthetic_document(token_count: int, seed: int) -> Tuple[object, TokenTable]:
+    # Realistic layouts, multi-page from a few thousand tokens on
+    template_bytes, ocr_text = generate_document(SyntheticDocumentSpec(token_count=token_count, multi_line_density=0.3, seed=seed))
+    return DocumentTemplateParserImpl().parse_document_template(template_bytes), OCRDataParserImpl().parse_ocr_tokens(ocr_text)
+
+
+def check_token_matcher(rng: random.Random, trials: int) -> int:
+    for _ in range(trials):
+        tokens = random_token_table(rng, rng.randint(0, 400), rng.randint(1, 60))
+        matcher = TokenMatcherService(tokens)
+        boxes = [random_box(rng) for _ in range(rng.randint(1, 3))]
+        if matcher.get_token_indices_in_bounding_box(boxes[0]) != reference_tokens_in_boxes(tokens, boxes[:1]):
+            raise AssertionError(f"grid query differs from the linear scan for box {boxes[0]}")
+        if matcher.get_token_indices_by_bounding_boxes(boxes) != reference_tokens_in_boxes(tokens, boxes):
+            raise AssertionError(f"grid query differs from the linear scan for boxes {boxes}")
+    return trials
+
+
+def check_row_clustering(rng: random.Random, trials: int, seed: int) -> int:
+    cases = 0
+    for _ in range(trials):
+        # Sizes straddle the threshold so both the sequential and the batched path run
+        token_count = rng.choice([rng.randint(1, 50), BATCH_CLUSTERING_MIN_TOKENS + rng.randint(0, 3000)])
+        tokens = random_token_table(rng, token_count, rng.randint(1, 200))
+        sorted_tokens = sort_indices_by_y(tokens)
+        for row_tolerance in (0.0, 0.002, rng.uniform(0.0005, 0.02)):
+            if list(iter_sorted_rows(sorted_tokens, tokens, row_tolerance)) != reference_sorted_rows(sorted_tokens, tokens, row_tolerance):
+                raise AssertionError(f"batched clustering differs for {token_count} tokens at tolerance {row_tolerance}")
+            cases += 1
+    
+    for token_count in DOCUMENT_SIZES:
+        _, tokens = synthetic_document(token_count, seed)
+        sorted_tokens = sort_indices_by_y(tokens)
+        if list(iter_sorted_rows(sorted_tokens, tokens, 0.006)) != reference_sorted_rows(sorted_tokens, tokens, 0.006):
+            raise AssertionError(f"batched clustering differs on the {token_count}-token document")
+        cases += 1
+    return cases
+
+
+def check_join(rng: random.Random, trials: int) -> int:
+    for _ in range(trials):
+        texts = [rng.choice(JOIN_TEXTS) for _ in range(rng.randint(0, 30))]
+        if join_texts_smartly(texts) != reference_join(texts):
+            raise AssertionError(f"join differs for {texts!r}")
+    return trials
+
+
+def check_merge(rng: random.Random, trials: int, seed: int) -> int:
+    processor = LineProcessorService()
+    for _ in range(trials):
+        lines, columns = random_lines(rng)
+        if [line.values for line in processor.merge_multi_line_entries(lines, columns)] != [line.values for line in reference_merge(lines, columns)]:
+            raise AssertionError(f"merge differs for {[line.values for line in lines]!r}")
+    
+    for token_count in DOCUMENT_SIZES:
+        template, tokens = synthetic_document(token_count, seed)
+        raw_lines = [line for page in tokens.pages() for line in extract_page_lines(template, page)]
+        columns = template.get_extraction_plan().columns
+        if [line.values for line in processor.merge_multi_line_entries(raw_lines, columns)] != [line.values for line in reference_merge(raw_lines, columns)]:
+            raise AssertionError(f"merge differs on the {token_count}-token document")
+    return trials + len(DOCUMENT_SIZES)
+
+
+def run_equivalence_checks(seed: int = 0, trials: int = 300) -> List[Tuple[str, Optional[str], int]]:
+    checks: Dict[str, Callable[[random.Random], int]] = {
+        "token matcher grid": lambda rng: check_token_matcher(rng, trials),
+        "row clustering": lambda rng: check_row_clustering(rng, max(1, trials // 10), seed),
+        "smart join": lambda rng: check_join(rng, trials * 10),
+        "multi-line merge": lambda rng: check_merge(rng, trials * 10, seed)
+    }
+    outcomes = []
+    for name, check in checks.items():
+        try:
+            outcomes.append((name, None, check(random.Random(seed))))
+        except AssertionError as e:
+            outcomes.append((name, str(e), 0))
+    return outcomes
+
+
+def report_equivalence(seed: int = 0, trials: int = 300) -> bool:
+    passed = True
+    for name, failure, cases in run_equivalence_checks(seed, trials):
+        passed = passed and failure is None
+        print(f"{name:>20}  {'ok (' + str(cases) + ' cases)' if failure is None else 'FAILED: ' + failure}")
+    return passed
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check optimized extraction routines against the implementations they replaced")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--trials", type=int, default=300)
+    args = parser.parse_args(argv)
+    return 0 if report_equivalence(args.seed, args.trials) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,66 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+
+IMPORT_BUDGET_MS = 200.0
+MODULES = ["src", "src.presentation.cli.batch_command", "main"]
+FORBIDDEN_PACKAGES = ["fastapi", "starlette", "pydantic", "uvicorn", "asyncio"]
+REPOSITORY_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in a fresh interpreter so nothing is already imported
+CHILD_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "packages": sorted({{name.split('.')[0] for name in sys.modules}})}}))
+"""
+
+
+def measure_import(module: str, repeat: int) -> Dict[str, object]:
+    # The best of several cold starts; the first run also compiles the bytecode cache
+    best = float("inf")
+    packages: List[str] = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", CHILD_SCRIPT.format(module=module)],
+            cwd=REPOSITORY_ROOT,
+            check=True,
+            capture_output=True,
+            text=True
+        ).stdout
+        measurement = json.loads(output)
+        best = min(best, measurement["seconds"])
+        packages = measurement["packages"]
+    return {"seconds": best, "forbidden": [name for name in FORBIDDEN_PACKAGES if name in packages]}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Fail when importing the library or CLI exceeds the cold-start budget")
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    args = parser.parse_args(argv)
+    
+    failed = False
+    print(f"{'module':>36} {'import (ms)':>12}  status")
+    for module in args.modules:
+        measurement = measure_import(module, args.repeat)
+        milliseconds = measurement["seconds"] * 1000
+        problems = []
+        if milliseconds > args.budget_ms:
+            problems.append(f"over {args.budget_ms:.0f} ms budget")
+        if measurement["forbidden"]:
+            problems.append(f"imports {', '.join(measurement['forbidden'])}")
+        failed = failed or bool(problems)
+        print(f"{module:>36} {milliseconds:>12.1f}  {'; '.join(problems) or 'ok'}")
+    
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
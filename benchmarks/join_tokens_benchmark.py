@@ -0,0 +1,37 @@
+import random
+import timeit
+from typing import Dict, List
+from src.utils.token_utils import join_texts_smartly
+
+
+TOKEN_COUNTS = [10, 100, 1000, 5000, 10000]
+SAMPLE_TEXTS = ["Invoice", "INV-1234", "&", "$", "1,234.56", "-", "(", "ref", ")", ",", "Ltd", "Co.", "12/03/2024"]
+
+
+def generate_cell_texts(token_count: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    return [rng.choice(SAMPLE_TEXTS) for _ in range(token_count)]
+
+
+def measure_join_scaling(token_counts: List[int] = TOKEN_COUNTS, repeat: int = 5) -> List[Dict[str, float]]:
+    results = []
+    for token_count in token_counts:
+        texts = generate_cell_texts(token_count)
+        number = max(1, 20000 // token_count)
+        best = min(timeit.repeat(lambda: join_texts_smartly(texts), number=number, repeat=repeat)) / number
+        results.append({
+            "tokens": token_count,
+            "seconds": best,
+            "microseconds_per_token": best / token_count * 1e6
+        })
+    return results
+
+
+def main() -> None:
+    print(f"{'tokens':>8} {'total (ms)':>12} {'per token (us)':>16}")
+    for result in measure_join_scaling():
+        print(f"{result['tokens']:>8} {result['seconds'] * 1000:>12.3f} {result['microseconds_per_token']:>16.3f}")
+
+
+if __name__ == "__main__":
+    main()
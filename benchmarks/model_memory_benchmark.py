@@ -0,0 +1,95 @@
+import argparse
+import gc
+import json
+import platform
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+from benchmarks.synthetic_documents import SyntheticDocumentSpec, generate_document
+from src.domain.models.document import BoundingBox, OCRToken
+from src.domain.models.output import OrderedFieldMap
+from src.infrastructure.factory.document_extractor_factory import build_document_extractor
+from src.infrastructure.parsers.document_template_parser import DocumentTemplateParserImpl
+from src.infrastructure.parsers.ocr_data_parser import OCRDataParserImpl
+
+
+TOKEN_COUNTS = [1000, 10000, 100000]
+MODEL_INSTANCES = 10000
+
+
+def trace_allocations(runner: Callable[[], Any]) -> Dict[str, int]:
+    # Peak traced memory while running, and the blocks still held by the returned value afterwards
+    gc.collect()
+    tracemalloc.start()
+    try:
+        retained = runner()
+        _, peak = tracemalloc.get_traced_memory()
+        statistics = tracemalloc.take_snapshot().statistics("filename")
+    finally:
+        tracemalloc.stop()
+    del retained
+    return {
+        "peak_bytes": peak,
+        "retained_bytes": sum(stat.size for stat in statistics),
+        "retained_blocks": sum(stat.count for stat in statistics)
+    }
+
+
+def measure_document(token_count: int, seed: int) -> Dict[str, int]:
+    template_bytes, ocr_text = generate_document(SyntheticDocumentSpec(token_count=token_count, seed=seed))
+    template_parser = DocumentTemplateParserImpl()
+    ocr_parser = OCRDataParserImpl()
+    
+    def extract() -> Any:
+        template = template_parser.parse_document_template(template_bytes)
+        tokens = ocr_parser.parse_ocr_tokens(ocr_text)
+        result = build_document_extractor(template, tokens).extract_document()
+        return template, tokens, result
+    
+    return trace_allocations(extract)
+
+
+def measure_models(count: int = MODEL_INSTANCES) -> Dict[str, Dict[str, int]]:
+    keys = ("date", "reference", "description")
+    runners = {
+        "BoundingBox": lambda: [BoundingBox(0.1, 0.2, 0.3, 0.4) for _ in range(count)],
+        "OCRToken": lambda: [OCRToken("text", BoundingBox(0.1, 0.2, 0.3, 0.4)) for _ in range(count)],
+        "OrderedFieldMap": lambda: [OrderedFieldMap(keys=keys, values={}) for _ in range(count)]
+    }
+    return {name: trace_allocations(runner) for name, runner in runners.items()}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Per-document and per-model memory footprint measured with tracemalloc")
+    parser.add_argument("--tokens", type=lambda value: [int(item) for item in value.split(",") if item.strip()], default=TOKEN_COUNTS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--baseline", help="compare against results previously written with --output")
+    args = parser.parse_args(argv)
+    
+    documents = {str(token_count): measure_document(token_count, args.seed) for token_count in args.tokens}
+    models = measure_models()
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    
+    print(f"{'tokens':>8} {'peak (KiB)':>12} {'retained (KiB)':>15} {'blocks':>10} {'vs baseline':>12}")
+    for token_count, entry in documents.items():
+        reference = baseline["documents"].get(token_count) if baseline else None
+        ratio = f"{entry['peak_bytes'] / reference['peak_bytes']:>11.2f}x" if reference else f"{'-':>12}"
+        print(
+            f"{token_count:>8} {entry['peak_bytes'] / 1024:>12.1f} {entry['retained_bytes'] / 1024:>15.1f} "
+            f"{entry['retained_blocks']:>10} {ratio}"
+        )
+    
+    print(f"\n{'model':>16} {'bytes/instance':>15} {'blocks/instance':>16}")
+    for name, entry in models.items():
+        print(f"{name:>16} {entry['retained_bytes'] / MODEL_INSTANCES:>15.1f} {entry['retained_blocks'] / MODEL_INSTANCES:>16.2f}")
+    
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"python": platform.python_version(), "documents": documents, "models": models}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
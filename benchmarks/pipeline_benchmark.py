@@ -0,0 +1,216 @@
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from benchmarks.equivalence_checks import report_equivalence
+from benchmarks.synthetic_documents import SyntheticDocumentSpec, generate_document
+from src.application.services.header_extractor_service import HeaderExtractorService
+from src.application.services.line_extractor_service import LineExtractorService
+from src.application.services.line_processor_service import LineProcessorService
+from src.application.services.paged_line_extractor_service import extract_page_lines
+from src.application.services.token_matcher_service import TokenMatcherService
+from src.domain.models.output import ExtractionResult, OrderedFieldMap
+from src.domain.models.token_table import numpy
+from src.infrastructure.config.extraction_context import create_extraction_context
+from src.infrastructure.parsers.document_template_parser import DocumentTemplateParserImpl
+from src.infrastructure.parsers.ocr_data_parser import OCRDataParserImpl
+from src.infrastructure.serialization.result_encoder import encode_extraction_result
+
+
+TOKEN_COUNTS = [100, 1000, 10000, 100000]
+COLUMN_COUNTS = [6]
+REGRESSION_THRESHOLD = 1.10
+
+
+def build_stage_runners(template_bytes: bytes, ocr_text: str) -> List[Tuple[str, Callable[[], Any]]]:
+    # Each stage runs on the output of the previous one, computed once up front,
+    # so a stage's measurement covers only its own work. Like the service, the line
+    # table of a multi-page document is analyzed and extracted page by page.
+    template_parser = DocumentTemplateParserImpl()
+    ocr_parser = OCRDataParserImpl()
+    template = template_parser.parse_document_template(template_bytes)
+    tokens = ocr_parser.parse_ocr_tokens(ocr_text)
+    pages = tokens.pages()
+    context = create_extraction_context(template, tokens)
+    columns = template.get_extraction_plan().columns
+    line_processor = LineProcessorService()
+    line_extractor = LineExtractorService(context, line_processor)
+    
+    def extract_raw_lines() -> List[OrderedFieldMap]:
+        if len(pages) > 1:
+            return [line for page in pages for line in extract_page_lines(template, page)]
+        return list(line_extractor.iter_raw_lines())
+    
+    header = HeaderExtractorService(context, TokenMatcherService(tokens)).extract_header()
+    raw_lines = extract_raw_lines()
+    result = ExtractionResult(header=header, lines=line_processor.merge_multi_line_entries(raw_lines, columns))
+    
+    def parse() -> Any:
+        return template_parser.parse_document_template(template_bytes), ocr_parser.parse_ocr_tokens(ocr_text)
+    
+    def analyze() -> Any:
+        return create_extraction_context(template, tokens)
+    
+    def extract_header() -> Any:
+        return HeaderExtractorService(context, TokenMatcherService(tokens)).extract_header()
+    
+    def merge() -> Any:
+        return line_processor.merge_multi_line_entries(raw_lines, columns)
+    
+    def serialize() -> Any:
+        return encode_extraction_result(result)
+    
+    return [
+        ("parse", parse),
+        ("analyze", analyze),
+        ("header", extract_header),
+        ("lines", extract_raw_lines),
+        ("merge", merge),
+        ("serialize", serialize)
+    ]
+
+
+def measure_stage(runner: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    # Timing and memory are separate runs because tracemalloc slows allocation-heavy code
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        runner()
+        best = min(best, time.perf_counter() - start)
+    
+    tracemalloc.start()
+    try:
+        runner()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    
+    return {"seconds": best, "peak_bytes": peak}
+
+
+def run_benchmarks(
+    token_counts: List[int] = TOKEN_COUNTS,
+    column_counts: List[int] = COLUMN_COUNTS,
+    row_noise: float = 0.1,
+    multi_line_density: float = 0.2,
+    repeat: int = 3,
+    seed: int = 0
+) -> List[Dict[str, Any]]:
+    results = []
+    for column_count in column_counts:
+        for token_count in token_counts:
+            spec = SyntheticDocumentSpec(
+                token_count=token_count,
+                column_count=column_count,
+                row_noise=row_noise,
+                multi_line_density=multi_line_density,
+                seed=seed
+            )
+            template_bytes, ocr_text = generate_document(spec)
+            for stage, runner in build_stage_runners(template_bytes, ocr_text):
+                measurement = measure_stage(runner, repeat)
+                results.append({
+                    "stage": stage,
+                    "tokens": token_count,
+                    "columns": column_count,
+                    "seconds": measurement["seconds"],
+                    "peak_bytes": measurement["peak_bytes"]
+                })
+    return results
+
+
+def compare_with_baseline(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    baseline_by_key = {(entry["stage"], entry["tokens"], entry["columns"]): entry for entry in baseline}
+    comparisons = []
+    for entry in results:
+        reference = baseline_by_key.get((entry["stage"], entry["tokens"], entry["columns"]))
+        if reference is None or not reference["seconds"]:
+            continue
+        comparisons.append({
+            "stage": entry["stage"],
+            "tokens": entry["tokens"],
+            "columns": entry["columns"],
+            "time_ratio": entry["seconds"] / reference["seconds"],
+            "memory_ratio": entry["peak_bytes"] / reference["peak_bytes"] if reference["peak_bytes"] else None
+        })
+    return comparisons
+
+
+def print_results(results: List[Dict[str, Any]]) -> None:
+    print(f"{'stage':>10} {'columns':>8} {'tokens':>8} {'time (ms)':>12} {'us/token':>10} {'peak (KiB)':>12}")
+    for entry in results:
+        print(
+            f"{entry['stage']:>10} {entry['columns']:>8} {entry['tokens']:>8} "
+            f"{entry['seconds'] * 1000:>12.3f} {entry['seconds'] / entry['tokens'] * 1e6:>10.3f} "
+            f"{entry['peak_bytes'] / 1024:>12.1f}"
+        )
+
+
+def print_comparisons(comparisons: List[Dict[str, Any]], threshold: float) -> None:
+    print(f"\n{'stage':>10} {'columns':>8} {'tokens':>8} {'time':>8} {'memory':>8}")
+    for entry in comparisons:
+        memory_ratio = entry["memory_ratio"]
+        flag = "  slower" if entry["time_ratio"] > threshold else ""
+        memory = f"{memory_ratio:>7.2f}x" if memory_ratio is not None else f"{'-':>8}"
+        print(
+            f"{entry['stage']:>10} {entry['columns']:>8} {entry['tokens']:>8} "
+            f"{entry['time_ratio']:>7.2f}x {memory}{flag}"
+        )
+
+
+def parse_int_list(value: str) -> List[int]:
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Per-stage extraction benchmarks on synthetic documents")
+    parser.add_argument("--tokens", type=parse_int_list, default=TOKEN_COUNTS, help="comma-separated token counts")
+    parser.add_argument("--columns", type=parse_int_list, default=COLUMN_COUNTS, help="comma-separated column counts")
+    parser.add_argument("--row-noise", type=float, default=0.1, help="row jitter as a fraction of the row pitch")
+    parser.add_argument("--multi-line-density", type=float, default=0.2, help="share of continuation rows")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--baseline", help="compare against results previously written with --output")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD, help="time ratio flagged as slower")
+    parser.add_argument("--verify", action="store_true", help="first check that optimized stages match the implementations they replaced")
+    args = parser.parse_args(argv)
+    
+    if args.verify and not report_equivalence(seed=args.seed):
+        sys.exit(1)
+    
+    results = run_benchmarks(
+        token_counts=args.tokens,
+        column_counts=args.columns,
+        row_noise=args.row_noise,
+        multi_line_density=args.multi_line_density,
+        repeat=args.repeat,
+        seed=args.seed
+    )
+    print_results(results)
+    
+    if args.output:
+        report = {
+            "python": platform.python_version(),
+            "numpy": numpy is not None,
+            "parameters": {
+                "row_noise": args.row_noise,
+                "multi_line_density": args.multi_line_density,
+                "seed": args.seed
+            },
+            "results": results
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        print_comparisons(compare_with_baseline(results, baseline), args.threshold)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import json
+import random
+from dataclasses import dataclass
+from typing import List, Tuple
+
+
+COLUMN_NAMES = [
+    "date", "reference", "description", "debit", "credit", "balance",
+    "due", "tax", "quantity", "code", "extended", "notes"
+]
+CELL_TEXTS = [
+    "Invoice", "INV-1234", "&", "$", "1,234.56", "-", "Payment", "thanks", "(", "ref", ")",
+    "...", "Co.", "Ltd", ",", "12/03/2024", "PO99812", "cont", "Credit", "Note"
+]
+DESCRIPTION_COLUMN = 2
+DATA_REGION_START = 0.23
+DATA_REGION_END = 0.73
+
+
+@dataclass
+class SyntheticDocumentSpec:
+    token_count: int
+    column_count: int = 6
+    row_noise: float = 0.1
+    multi_line_density: float = 0.2
+    rows_per_page: int = 40
+    seed: int = 0
+
+
+def generate_document(spec: SyntheticDocumentSpec) -> Tuple[bytes, str]:
+    # Deterministic for a given spec: the same template bytes and OCR text every time
+    rng = random.Random(spec.seed)
+    column_count = max(1, min(spec.column_count, len(COLUMN_NAMES)))
+    column_x = [0.05 + i * (0.9 / column_count) for i in range(column_count)]
+    column_width = 0.9 / column_count
+    
+    template = {
+        "header": {
+            "supplier_name": {"bbox": [0.05, 0.02, 0.5, 0.05]},
+            "customer_name": {"token_bboxes": [[0.55, 0.02, 0.7, 0.05], [0.7, 0.02, 0.95, 0.05]]},
+            "statement_date": {"value": "2024-01-01"},
+            "remit_to": {"bbox": [0.05, 0.06, 0.6, 0.16]},
+            "statement_total_balance": {"bbox": [0.7, 0.1, 0.95, 0.14]}
+        },
+        "columns": [
+            {
+                "source": COLUMN_NAMES[i].title(),
+                "canonical": COLUMN_NAMES[i],
+                "bbox": [column_x[i], 0.2, column_x[i] + column_width * 0.8, 0.215]
+            }
+            for i in range(column_count)
+        ]
+    }
+    
+    # Rows are added until the token budget is reached; a new page starts every rows_per_page rows
+    row_pitch = (DATA_REGION_END - DATA_REGION_START) / spec.rows_per_page
+    lines = []
+    token_count = 0
+    row = 0
+    while token_count < spec.token_count:
+        if row % spec.rows_per_page == 0:
+            page_lines = _generate_page_furniture(row // spec.rows_per_page + 1, column_x, column_width)
+            lines.extend(page_lines)
+            token_count += len(page_lines) - 1
+        row_lines = _generate_row(rng, spec, column_x, column_width, DATA_REGION_START + (row % spec.rows_per_page) * row_pitch, row_pitch)
+        lines.extend(row_lines)
+        token_count += len(row_lines)
+        row += 1
+    
+    return json.dumps(template).encode("utf-8"), "\n".join(lines) + "\n"
+
+
+def _generate_page_furniture(page: int, column_x: List[float], column_width: float) -> List[str]:
+    # Page separator, header block and column titles
+    lines = [
+        f"### page {page}",
+        _token_line("ACME Supplies Ltd", 0.06, 0.03, 0.2, 0.045),
+        _token_line("Bob", 0.56, 0.03, 0.6, 0.045),
+        _token_line("Smith", 0.72, 0.03, 0.8, 0.045),
+        _token_line("500.00", 0.735, 0.11, 0.8, 0.12),
+        _token_line("Total due", 0.05, 0.9, 0.2, 0.91)
+    ]
+    for i, x in enumerate(column_x):
+        lines.append(_token_line(COLUMN_NAMES[i].title(), x, 0.2, x + column_width * 0.7, 0.215))
+    return lines
+
+
+def _generate_row(rng: random.Random, spec: SyntheticDocumentSpec, column_x: List[float], column_width: float, y: float, row_pitch: float) -> List[str]:
+    # Continuation rows only carry text in the description column
+    continuation = rng.random() < spec.multi_line_density
+    description_column = min(DESCRIPTION_COLUMN, len(column_x) - 1)
+    token_height = row_pitch * 0.6
+    lines = []
+    
+    for i, x in enumerate(column_x):
+        if continuation and i != description_column:
+            continue
+        
+        token_x = x + rng.uniform(0, column_width * 0.05)
+        for _ in range(rng.randint(1, 3)):
+            width = rng.uniform(0.1, 0.3) * column_width
+            token_y = y + rng.gauss(0, spec.row_noise * row_pitch)
+            lines.append(_token_line(rng.choice(CELL_TEXTS), token_x, token_y, token_x + width, token_y + token_height))
+            token_x += width + 0.003
+    
+    return lines
+
+
+def _token_line(text: str, x0: float, y0: float, x1: float, y1: float) -> str:
+    return f"{text} | [{x0:.5f}, {y0:.5f}, {x1:.5f}, {y1:.5f}]"
\ No newline at end of file
@@ -1,34 +1,136 @@
+import functools
 import logging
-from fastapi import FastAPI, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Optional
 from src.infrastructure.parsers.document_template_parser import DocumentTemplateParserImpl
+from src.infrastructure.parsers.cached_document_template_parser import CachedDocumentTemplateParser
 from src.infrastructure.parsers.ocr_data_parser import OCRDataParserImpl
-from src.infrastructure.factory.document_extractor_factory import create_document_extractor
-from src.presentation.handlers.extraction_handler import ExtractionHandler
-from src.presentation.handlers.health_handler import HealthHandler
+from src.infrastructure.factory.document_extractor_factory import create_document_extractor, create_document_extractor_async
+from src.infrastructure.factory.batch_extractor_pool import BatchExtractorPool
+from src.infrastructure.config.server_config import ServerConfiguration
+from src.infrastructure.caching.result_cache import COUNTER_STATS, ResultCache
+from src.infrastructure.metrics.extraction_metrics import MetricsRegistry
+from src.infrastructure.profiling.request_profiler import RequestProfiler
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+    from src.presentation.handlers.extraction_handler import ExtractionHandler
 
 
 class ApplicationDependencies:
     def __init__(self):
+        # The handlers pull in FastAPI and asyncio, so they are imported only when the server is wired
+        from src.infrastructure.concurrency.bounded_executor import create_bounded_executor
+        from src.presentation.handlers.batch_extraction_handler import BatchExtractionHandler
+        from src.presentation.handlers.health_handler import HealthHandler
+        from src.presentation.handlers.metrics_handler import MetricsHandler
+        
+        self.server_config = ServerConfiguration()
         self.health_handler = HealthHandler()
+        self.metrics = MetricsRegistry() if self.server_config.metrics_enabled else None
+        self.metrics_handler = MetricsHandler(self.metrics)
+        self.extraction_executor = create_bounded_executor(
+            kind=self.server_config.extract_executor,
+            max_concurrency=self.server_config.extract_max_concurrency,
+            max_queue=self.server_config.extract_max_queue,
+            retry_after_seconds=self.server_config.extract_retry_after
+        )
+        self.page_executor = self._create_page_executor()
         self.extraction_handler = self._create_extraction_handler()
+        self.batch_pool = BatchExtractorPool(max_workers=self.server_config.batch_max_workers)
+        self.batch_extraction_handler = BatchExtractionHandler(self.batch_pool)
     
-    def _create_extraction_handler(self) -> ExtractionHandler:
-        template_parser = DocumentTemplateParserImpl()
+    def _create_extraction_handler(self) -> 'ExtractionHandler':
+        from src.presentation.handlers.extraction_handler import ExtractionHandler
+        
+        template_parser = self._create_template_parser()
         ocr_parser = OCRDataParserImpl()
         
+        # Worker processes cannot share the loaded inputs, so only thread mode loads them concurrently
+        extractor_factory = create_document_extractor
+        async_extractor_factory = None
+        if self.server_config.extract_executor == "thread":
+            extractor_factory = functools.partial(
+                create_document_extractor,
+                page_executor=self.page_executor
+            )
+            async_extractor_factory = functools.partial(
+                create_document_extractor_async,
+                read_ahead=self.server_config.extract_read_ahead,
+                page_executor=self.page_executor
+            )
+        
         return ExtractionHandler(
             template_parser=template_parser,
             ocr_parser=ocr_parser,
-            extractor_factory=create_document_extractor
+            extractor_factory=extractor_factory,
+            extraction_executor=self.extraction_executor,
+            async_extractor_factory=async_extractor_factory,
+            metrics=self.metrics,
+            profiler=self._create_profiler(),
+            result_cache=self._create_result_cache()
         )
+    
+    def _create_result_cache(self) -> Optional[ResultCache]:
+        # Disabled only when both the memory and the disk tier are turned off
+        if self.server_config.result_cache_size == 0 and not self.server_config.result_cache_dir:
+            return None
+        result_cache = ResultCache(
+            max_entries=self.server_config.result_cache_size,
+            directory=self.server_config.result_cache_dir or None,
+            max_disk_bytes=self.server_config.result_cache_max_mb * 1024 * 1024
+        )
+        if self.metrics is not None:
+            self.metrics.add_collector("result_cache", result_cache.stats, counters=COUNTER_STATS)
+        return result_cache
+    
+    def _create_profiler(self) -> Optional[RequestProfiler]:
+        # Profiling stays off unless an output directory is configured
+        if not self.server_config.profile_dir:
+            return None
+        return RequestProfiler(
+            self.server_config.profile_dir,
+            sample_every=self.server_config.profile_sample_every,
+            allow_header=self.server_config.profile_header_enabled
+        )
+    
+    def _create_page_executor(self) -> Optional[ProcessPoolExecutor]:
+        # Pages of multi-page documents are extracted in parallel; process mode already runs one document per worker
+        if self.server_config.page_max_workers == 0 or self.server_config.extract_executor != "thread":
+            return None
+        return ProcessPoolExecutor(max_workers=self.server_config.page_max_workers)
+    
+    def _create_template_parser(self) -> CachedDocumentTemplateParser:
+        template_parser = CachedDocumentTemplateParser(
+            DocumentTemplateParserImpl(),
+            max_entries=self.server_config.template_cache_size
+        )
+        
+        # Process workers unpickle the parser into their own per-process caches, so this
+        # cache is only read, and only worth warming, in thread mode
+        if self.server_config.extract_executor != "thread":
+            if self.server_config.template_preload_dir:
+                logging.info("TEMPLATE_PRELOAD_DIR is ignored with EXTRACT_EXECUTOR=process")
+            return template_parser
+        
+        if self.server_config.template_preload_dir:
+            loaded = template_parser.preload_directory(self.server_config.template_preload_dir)
+            logging.info(f"Preloaded {loaded} templates from {self.server_config.template_preload_dir}")
+        if self.metrics is not None:
+            self.metrics.add_collector("template_cache", template_parser.stats, counters=("hits", "misses"))
+        
+        return template_parser
 
 
 def wire_application_dependencies() -> ApplicationDependencies:
     return ApplicationDependencies()
 
 
-def setup_fastapi_server(dependencies: ApplicationDependencies) -> FastAPI:
+def setup_fastapi_server(dependencies: ApplicationDependencies) -> 'FastAPI':
+    from fastapi import FastAPI, Request
+    from fastapi.middleware.cors import CORSMiddleware
+    
     app = FastAPI(
         title="OCR Extractor API",
         description="Adaptive template-based OCR document extraction service",
@@ -48,9 +150,24 @@ def setup_fastapi_server(dependencies: ApplicationDependencies) -> FastAPI:
     async def health_check():
         return await dependencies.health_handler.handle_health_check()
     
+    @app.get("/metrics")
+    async def metrics():
+        return await dependencies.metrics_handler.handle_metrics()
+    
     @app.post("/extract-files")
-    async def extract_files(request_data: dict):
-        return await dependencies.extraction_handler.handle_extract_files(request_data)
+    async def extract_files(request: Request):
+        return await dependencies.extraction_handler.handle_extract_request(request)
+    
+    @app.post("/extract-batch")
+    async def extract_batch(request_data: dict):
+        return await dependencies.batch_extraction_handler.handle_extract_batch(request_data)
+    
+    @app.on_event("shutdown")
+    def shutdown_executors():
+        dependencies.extraction_executor.shutdown()
+        dependencies.batch_pool.shutdown()
+        if dependencies.page_executor is not None:
+            dependencies.page_executor.shutdown(wait=True, cancel_futures=True)
     
     return app
 
@@ -68,4 +185,7 @@ def start_server():
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        from src.presentation.cli.batch_command import main as run_batch_command
+        sys.exit(run_batch_command(sys.argv[2:]))
     start_server()
\ No newline at end of file
@@ -0,0 +1,15 @@
+# Public library API. Only the domain, application and infrastructure layers are
+# imported here; the FastAPI server is loaded by main.py alone.
+from .domain.models.output import DocumentHeader, ExtractionResult, OrderedFieldMap
+from .domain.models.timings import StageTimings
+from .extractor import extract
+from .infrastructure.factory.document_extractor_factory import ExtractionSetupError
+
+__all__ = [
+    "extract",
+    "DocumentHeader",
+    "ExtractionResult",
+    "ExtractionSetupError",
+    "OrderedFieldMap",
+    "StageTimings"
+]
\ No newline at end of file
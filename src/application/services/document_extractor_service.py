@@ -1,17 +1,29 @@
+from typing import Iterator, Optional
 from ...domain.interfaces.parser import DocumentExtractor, HeaderExtractor, LineExtractor
-from ...domain.models.output import ExtractionResult
+from ...domain.models.output import DocumentHeader, ExtractionResult, OrderedFieldMap
+from ...domain.models.timings import StageTimings, time_stage
 
 
 class DocumentExtractorService(DocumentExtractor):
-    def __init__(self, header_extractor: HeaderExtractor, line_extractor: LineExtractor):
+    def __init__(self, header_extractor: HeaderExtractor, line_extractor: LineExtractor, timings: Optional[StageTimings] = None):
         self.header_extractor = header_extractor
         self.line_extractor = line_extractor
+        self.timings = timings
     
     def extract_document(self) -> ExtractionResult:
-        header = self.header_extractor.extract_header()
+        with time_stage(self.timings, "header"):
+            header = self.header_extractor.extract_header()
         lines = self.line_extractor.extract_lines()
+        if self.timings is not None:
+            self.timings.line_count = len(lines)
         
         return ExtractionResult(
             header=header,
             lines=lines
-        )
\ No newline at end of file
+        )
+    
+    def extract_header(self) -> DocumentHeader:
+        return self.header_extractor.extract_header()
+    
+    def iter_lines(self) -> Iterator[OrderedFieldMap]:
+        return self.line_extractor.iter_lines()
\ No newline at end of file
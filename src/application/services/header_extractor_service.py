@@ -1,38 +1,36 @@
 from typing import Optional
 from ...domain.interfaces.parser import HeaderExtractor, TokenMatcher
-from ...domain.models.document import DocumentTemplate
+from ...domain.models.context import ExtractionContext
 from ...domain.models.output import DocumentHeader
-from ...utils.token_utils import sort_tokens_by_x_with_tolerance, join_tokens_smartly, create_string_pointer
+from ...utils.token_utils import join_texts_smartly, create_string_pointer
 
 
 class HeaderExtractorService(HeaderExtractor):
-    def __init__(self, template: DocumentTemplate, token_matcher: TokenMatcher, row_tolerance: float):
-        self.template = template
+    def __init__(self, context: ExtractionContext, token_matcher: TokenMatcher):
+        self.plan = context.plan
+        self.tokens = context.tokens
+        self.reading_rank = context.reading_rank
         self.token_matcher = token_matcher
-        self.row_tolerance = row_tolerance
     
     def extract_header(self) -> DocumentHeader:
         def extract_field_value(field_key: str) -> Optional[str]:
-            if field_key not in self.template.header:
+            query = self.plan.header_queries.get(field_key)
+            if query is None:
                 return None
             
-            specification = self.template.header[field_key]
+            if query.value is not None:
+                return query.value
             
-            if specification.value and specification.value.strip():
-                return create_string_pointer(specification.value.strip())
-            
-            token_boxes = specification.get_token_bounding_boxes()
-            if token_boxes:
-                tokens = self.token_matcher.get_tokens_by_bounding_boxes(token_boxes)
-                sort_tokens_by_x_with_tolerance(tokens, self.row_tolerance)
-                text = join_tokens_smartly(tokens)
+            if query.token_boxes:
+                indices = self.token_matcher.get_token_indices_by_bounding_boxes(query.token_boxes)
+                indices.sort(key=self.reading_rank.__getitem__)
+                text = join_texts_smartly(self.tokens.texts_at(indices))
                 return create_string_pointer(text)
             
-            bounding_box, has_box = specification.get_bounding_box()
-            if has_box and bounding_box:
-                tokens = self.token_matcher.get_tokens_in_bounding_box(bounding_box)
-                sort_tokens_by_x_with_tolerance(tokens, self.row_tolerance)
-                text = join_tokens_smartly(tokens)
+            if query.box is not None:
+                indices = self.token_matcher.get_token_indices_in_bounding_box(query.box)
+                indices.sort(key=self.reading_rank.__getitem__)
+                text = join_texts_smartly(self.tokens.texts_at(indices))
                 return create_string_pointer(text)
             
             return None
@@ -1,141 +1,140 @@
 import re
-from typing import List
+from typing import Dict, Iterable, Iterator, List, Sequence
 from ...domain.interfaces.parser import LineProcessor
 from ...domain.models.output import OrderedFieldMap
 from ...domain.models.document import ColumnSpecification
-from ...utils.token_utils import create_string_pointer
 
 
-class LineProcessorService(LineProcessor):
-    def __init__(self):
-        pass
+# A field is structured (a date, amount or reference rather than free text) when it
+# contains one of these markers, when it is a single word of three characters or
+# more or containing a '.', or when it has a digit plus a separator, a reference
+# prefix or at least six characters
+_STRUCTURED_MARKER = re.compile(r'[/$¢€£¥]|USD|AUD|NZD|CAD')
+_REFERENCE_PREFIX = re.compile(r'INV|PO|REF|IV')
+_ASCII_DIGIT = re.compile(r'[0-9]')
+CONTINUATION_MARKERS = ("&", ",", "-", "...", "..", ";", ":", "\\", "/", "+", "cont", "continued", "(cont)")
+
+
+def _has_digit(text: str) -> bool:
+    # str.isdigit also accepts non-ASCII digits, which only the slow path has to look for
+    if text.isascii():
+        return _ASCII_DIGIT.search(text) is not None
+    return any(c.isdigit() for c in text)
+
+
+def _is_structured_text(text: str) -> bool:
+    if _STRUCTURED_MARKER.search(text) is not None:
+        return True
     
-    def merge_multi_line_entries(self, lines: List[OrderedFieldMap], columns: List[ColumnSpecification]) -> List[OrderedFieldMap]:
+    if len(text.split()) == 1 and ("." in text or len(text) >= 3):
+        return True
+    
+    if not _has_digit(text):
+        return False
+    return ("-" in text or "." in text or "," in text or len(text) >= 6
+            or _REFERENCE_PREFIX.search(text.upper()) is not None)
+
+
+def _count_non_empty_fields(line: OrderedFieldMap) -> int:
+    count = 0
+    for value in line.values.values():
+        if value and value.strip():
+            count += 1
+    return count
+
+
+def _has_at_most_one_structured_field(line: OrderedFieldMap, keys: Sequence[str]) -> bool:
+    values = line.values
+    structured = 0
+    for key in keys:
+        value = values.get(key)
+        if value and _is_structured_text(value.strip()):
+            structured += 1
+            if structured > 1:
+                return False
+    return True
+
+
+class LineProcessorService(LineProcessor):
+    def merge_multi_line_entries(self, lines: List[OrderedFieldMap], columns: Sequence[ColumnSpecification]) -> List[OrderedFieldMap]:
         if len(lines) <= 1:
             return lines
         
-        result = []
-        i = 0
-        
-        while i < len(lines):
-            current_line = lines[i]
-            continuation_lines = self._find_continuation_lines(lines, i, columns)
-            
-            if continuation_lines:
-                merged_line = self._merge_lines_content(current_line, continuation_lines, columns)
-                result.append(merged_line)
-                i += len(continuation_lines) + 1
-            else:
-                result.append(current_line)
-                i += 1
-        
-        return result
+        return list(self.iter_merged_entries(lines, columns))
     
-    def _find_continuation_lines(self, lines: List[OrderedFieldMap], start_index: int, columns: List[ColumnSpecification]) -> List[OrderedFieldMap]:
-        if start_index >= len(lines) - 1:
-            return []
-        
-        continuations = []
-        current_line = lines[start_index]
-        
-        for i in range(start_index + 1, len(lines)):
-            next_line = lines[i]
+    def iter_merged_entries(self, lines: Iterable[OrderedFieldMap], columns: Sequence[ColumnSpecification]) -> Iterator[OrderedFieldMap]:
+        # One pass with one line of lookahead. Each line's non-empty count is taken once; a line
+        # continues the current entry when it has fewer filled fields and at most one structured one
+        keys = [column.canonical for column in columns]
+        current_line = None
+        current_count = 0
+        continuation_lines = []
+        
+        for line in lines:
+            count = _count_non_empty_fields(line)
+            if current_line is not None and count < current_count and _has_at_most_one_structured_field(line, keys):
+                continuation_lines.append(line)
+                continue
             
-            if self._is_continuation_line(current_line, next_line, columns):
-                continuations.append(next_line)
-            else:
-                break
-        
-        return continuations
+            if current_line is not None:
+                yield self._finish_entry(current_line, continuation_lines, keys)
+            current_line = line
+            current_count = count
+            continuation_lines = []
+        
+        if current_line is not None:
+            yield self._finish_entry(current_line, continuation_lines, keys)
     
-    def _is_continuation_line(self, current_line: OrderedFieldMap, next_line: OrderedFieldMap, columns: List[ColumnSpecification]) -> bool:
-        current_non_empty = self._count_non_empty_fields(current_line)
-        next_non_empty = self._count_non_empty_fields(next_line)
-        
-        if next_non_empty >= current_non_empty:
-            return False
-        
-        meaningful_fields = 0
-        for column in columns:
-            if next_line.values:
-                value = next_line.values.get(column.canonical)
-                if value:
-                    text = value.strip()
-                    if self._is_structured_field(text):
-                        meaningful_fields += 1
-        
-        return meaningful_fields <= 1
+    def _finish_entry(self, current_line: OrderedFieldMap, continuation_lines: List[OrderedFieldMap], keys: Sequence[str]) -> OrderedFieldMap:
+        if continuation_lines:
+            return self._merge_lines_content(current_line, continuation_lines, keys)
+        return current_line
     
-    def _merge_lines_content(self, current_line: OrderedFieldMap, continuations: List[OrderedFieldMap], columns: List[ColumnSpecification]) -> OrderedFieldMap:
-        merged = OrderedFieldMap(
-            keys=current_line.keys.copy(),
-            values=current_line.values.copy() if current_line.values else {}
-        )
+    def _merge_lines_content(self, current_line: OrderedFieldMap, continuations: List[OrderedFieldMap], keys: Sequence[str]) -> OrderedFieldMap:
+        # Merged cells are collected as parts and joined once; a cell missing from the entry
+        # takes the continuation's value as is
+        values = current_line.values.copy() if current_line.values else {}
+        parts_by_key: Dict[str, List[str]] = {}
         
         for continuation_line in continuations:
-            for column in columns:
-                key = column.canonical
-                current_value = merged.values.get(key)
-                continuation_value = continuation_line.values.get(key)
+            continuation_values = continuation_line.values
+            for key in keys:
+                continuation_value = continuation_values.get(key)
+                if not continuation_value:
+                    continue
                 
-                if current_value and continuation_value:
+                parts = parts_by_key.get(key)
+                if parts is None:
+                    current_value = values.get(key)
+                    if not current_value:
+                        values[key] = continuation_value
+                        continue
+                    continuation_text = continuation_value.strip()
+                    if not continuation_text:
+                        continue
                     current_text = current_value.strip()
+                    parts = parts_by_key[key] = [current_text] if current_text else []
+                else:
                     continuation_text = continuation_value.strip()
-                    
-                    if continuation_text:
-                        if self._has_continuation_marker(current_text):
-                            merged.values[key] = create_string_pointer(self._merge_continuation_text(current_text, continuation_text))
-                        else:
-                            merged.values[key] = create_string_pointer(f"{current_text} {continuation_text}")
-                elif not current_value and continuation_value:
-                    merged.values[key] = continuation_value
-        
-        return merged
-    
-    def _count_non_empty_fields(self, line: OrderedFieldMap) -> int:
-        count = 0
-        for value in line.values.values():
-            if value and value.strip():
-                count += 1
-        return count
-    
-    def _is_structured_field(self, text: str) -> bool:
-        if not text:
-            return False
-        
-        if self._is_date_field(text):
-            return True
-        
-        if self._is_currency_field(text):
-            return True
-        
-        if self._is_reference_field(text):
-            return True
-        
-        if len(text.split()) == 1 and len(text) >= 3:
-            return True
+                    if not continuation_text:
+                        continue
+                
+                self._append_continuation(parts, continuation_text)
         
-        return False
-    
-    def _is_date_field(self, text: str) -> bool:
-        return ("/" in text or 
-                ("-" in text and any(c.isdigit() for c in text)) or
-                ("." in text and len(text.split()) == 1))
-    
-    def _is_currency_field(self, text: str) -> bool:
-        return (any(symbol in text for symbol in "$¢€£¥") or
-                any(code in text for code in ["USD", "AUD", "NZD", "CAD"]) or
-                (any(c.isdigit() for c in text) and any(sep in text for sep in [".", ","])))
-    
-    def _is_reference_field(self, text: str) -> bool:
-        upper_text = text.upper()
-        return (any(c.isdigit() for c in text) and 
-                (any(prefix in upper_text for prefix in ["INV", "PO", "REF", "IV"]) or
-                 len(text) >= 6))
+        for key, parts in parts_by_key.items():
+            values[key] = "".join(parts)
+        return OrderedFieldMap(keys=current_line.keys, values=values)
     
-    def _has_continuation_marker(self, text: str) -> bool:
-        markers = ["&", ",", "-", "...", "..", ";", ":", "\\", "/", "+", "cont", "continued", "(cont)"]
-        return any(text.endswith(marker) for marker in markers)
+    def _append_continuation(self, parts: List[str], continuation_text: str) -> None:
+        # Parts are separated by single spaces, so the joined text ends with a marker only when
+        # its last part does; a marker rewrites the end of the text, so the parts collapse first
+        if parts and parts[-1].endswith(CONTINUATION_MARKERS):
+            parts[:] = [self._merge_continuation_text("".join(parts), continuation_text).strip()]
+        elif parts:
+            parts.append(" ")
+            parts.append(continuation_text)
+        else:
+            parts.append(continuation_text)
     
     def _merge_continuation_text(self, current: str, continuation: str) -> str:
         if current.endswith("&"):
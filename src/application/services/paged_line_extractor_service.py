@@ -0,0 +1,58 @@
+from functools import partial
+from itertools import chain
+from typing import Callable, Iterable, Iterator, List, Optional
+from ...domain.interfaces.parser import LineExtractor, LineProcessor
+from ...domain.models.document import DocumentTemplate
+from ...domain.models.output import OrderedFieldMap
+from ...domain.models.token_table import TokenTable
+from ...domain.models.timings import StageTimings, time_stage
+from ...infrastructure.config.extraction_context import create_extraction_context
+from .line_extractor_service import LineExtractorService
+from .line_processor_service import LineProcessorService
+
+
+PageMapper = Callable[[Callable[[TokenTable], List[OrderedFieldMap]], Iterable[TokenTable]], Iterable[List[OrderedFieldMap]]]
+
+
+def extract_page_lines(template: DocumentTemplate, page_tokens: TokenTable) -> List[OrderedFieldMap]:
+    context = create_extraction_context(template, page_tokens)
+    line_extractor = LineExtractorService(context, LineProcessorService())
+    return list(line_extractor.iter_raw_lines())
+
+
+class PagedLineExtractorService(LineExtractor):
+    # Lines are merged over all pages so entries continue across page breaks
+    def __init__(
+        self,
+        template: DocumentTemplate,
+        pages: List[TokenTable],
+        line_processor: LineProcessor,
+        page_mapper: PageMapper = map,
+        timings: Optional[StageTimings] = None
+    ):
+        self.template = template
+        self.pages = pages
+        self.line_processor = line_processor
+        self.page_mapper = page_mapper
+        self.timings = timings
+    
+    def extract_lines(self) -> List[OrderedFieldMap]:
+        if not self.template.columns:
+            return []
+        
+        columns = self.template.get_extraction_plan().columns
+        with time_stage(self.timings, "rows"):
+            page_lines = self.page_mapper(partial(extract_page_lines, self.template), self.pages)
+            raw_lines = list(chain.from_iterable(page_lines))
+        with time_stage(self.timings, "merge"):
+            return self.line_processor.merge_multi_line_entries(raw_lines, columns)
+    
+    def iter_lines(self) -> Iterator[OrderedFieldMap]:
+        if not self.template.columns:
+            return iter(())
+        
+        # Pages come back in order, so the merge starts as soon as the first page is done
+        page_lines = self.page_mapper(partial(extract_page_lines, self.template), self.pages)
+        columns = self.template.get_extraction_plan().columns
+        
+        return self.line_processor.iter_merged_entries(chain.from_iterable(page_lines), columns)
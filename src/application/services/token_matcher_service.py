@@ -1,25 +1,56 @@
-from typing import List
+import math
+from typing import Dict, List, Sequence, Tuple
 from ...domain.interfaces.parser import TokenMatcher
-from ...domain.models.document import OCRToken, BoundingBox
+from ...domain.models.document import BoundingBox
+from ...domain.models.token_table import TokenTable
 
 
 class TokenMatcherService(TokenMatcher):
-    def __init__(self, tokens: List[OCRToken]):
+    TOKENS_PER_CELL = 4
+    MAX_GRID_SIZE = 256
+    
+    def __init__(self, tokens: TokenTable):
         self.tokens = tokens
+        self.mid_x = tokens.mid_x
+        self.mid_y = tokens.mid_y
+        self.grid_size = self._calculate_grid_size(len(tokens))
+        self.grid = self._build_grid()
     
-    def get_tokens_by_bounding_boxes(self, boxes: List[BoundingBox]) -> List[OCRToken]:
-        result = []
-        for token in self.tokens:
-            mid_x, mid_y = token.bounding_box.mid_x(), token.bounding_box.mid_y()
-            for box in boxes:
-                if mid_x >= box.x0 and mid_x <= box.x1 and mid_y >= box.y0 and mid_y <= box.y1:
-                    result.append(token)
-                    break
-        return result
+    def get_token_indices_by_bounding_boxes(self, boxes: Sequence[BoundingBox]) -> List[int]:
+        matches = set()
+        for box in boxes:
+            matches.update(self._query_box(box))
+        return sorted(matches)
+    
+    def get_token_indices_in_bounding_box(self, box: BoundingBox) -> List[int]:
+        return sorted(self._query_box(box))
     
-    def get_tokens_in_bounding_box(self, box: BoundingBox) -> List[OCRToken]:
+    def _calculate_grid_size(self, token_count: int) -> int:
+        size = math.ceil(math.sqrt(token_count / self.TOKENS_PER_CELL))
+        return max(1, min(size, self.MAX_GRID_SIZE))
+    
+    def _cell_index(self, value: float) -> int:
+        # Monotonic and clamped, so every token whose mid-point lies inside a box
+        # is stored in one of the cells spanned by the box edges
+        if not value > 0.0:
+            return 0
+        if value >= 1.0:
+            return self.grid_size - 1
+        return min(int(value * self.grid_size), self.grid_size - 1)
+    
+    def _build_grid(self) -> Dict[Tuple[int, int], List[int]]:
+        grid = {}
+        for i in range(len(self.tokens)):
+            cell = (self._cell_index(self.mid_x[i]), self._cell_index(self.mid_y[i]))
+            grid.setdefault(cell, []).append(i)
+        return grid
+    
+    def _query_box(self, box: BoundingBox) -> List[int]:
         result = []
-        for token in self.tokens:
-            if box.contains_center(token):
-                result.append(token)
-        return result
\ No newline at end of file
+        for cell_x in range(self._cell_index(box.x0), self._cell_index(box.x1) + 1):
+            for cell_y in range(self._cell_index(box.y0), self._cell_index(box.y1) + 1):
+                for i in self.grid.get((cell_x, cell_y), ()):
+                    mid_x, mid_y = self.mid_x[i], self.mid_y[i]
+                    if mid_x >= box.x0 and mid_x <= box.x1 and mid_y >= box.y0 and mid_y <= box.y1:
+                        result.append(i)
+        return result
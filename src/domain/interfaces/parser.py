@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import List
-from ..models.document import DocumentTemplate, OCRToken
+from pathlib import Path
+from typing import Iterable, Iterator, List, Sequence, Union
+from ..models.document import DocumentTemplate
+from ..models.token_table import TokenTable
 from ..models.output import ExtractionResult, DocumentHeader, OrderedFieldMap
 from ..models.document import BoundingBox, ColumnSpecification
 
@@ -9,11 +11,19 @@ class DocumentTemplateParser(ABC):
     @abstractmethod
     def parse_document_template(self, data: bytes) -> DocumentTemplate:
         pass
+    
+    @abstractmethod
+    def parse_document_template_file(self, path: Union[str, Path]) -> DocumentTemplate:
+        pass
 
 
 class OCRDataParser(ABC):
     @abstractmethod
-    def parse_ocr_tokens(self, data: str) -> List[OCRToken]:
+    def parse_ocr_tokens(self, data: str) -> TokenTable:
+        pass
+    
+    @abstractmethod
+    def parse_ocr_file(self, path: Union[str, Path]) -> TokenTable:
         pass
 
 
@@ -21,6 +31,14 @@ class DocumentExtractor(ABC):
     @abstractmethod
     def extract_document(self) -> ExtractionResult:
         pass
+    
+    @abstractmethod
+    def extract_header(self) -> DocumentHeader:
+        pass
+    
+    @abstractmethod
+    def iter_lines(self) -> Iterator[OrderedFieldMap]:
+        pass
 
 
 class HeaderExtractor(ABC):
@@ -33,19 +51,27 @@ class LineExtractor(ABC):
     @abstractmethod
     def extract_lines(self) -> List[OrderedFieldMap]:
         pass
+    
+    @abstractmethod
+    def iter_lines(self) -> Iterator[OrderedFieldMap]:
+        pass
 
 
 class TokenMatcher(ABC):
     @abstractmethod
-    def get_tokens_by_bounding_boxes(self, boxes: List[BoundingBox]) -> List[OCRToken]:
+    def get_token_indices_by_bounding_boxes(self, boxes: Sequence[BoundingBox]) -> List[int]:
         pass
     
     @abstractmethod
-    def get_tokens_in_bounding_box(self, box: BoundingBox) -> List[OCRToken]:
+    def get_token_indices_in_bounding_box(self, box: BoundingBox) -> List[int]:
         pass
 
 
 class LineProcessor(ABC):
     @abstractmethod
-    def merge_multi_line_entries(self, lines: List[OrderedFieldMap], columns: List[ColumnSpecification]) -> List[OrderedFieldMap]:
+    def merge_multi_line_entries(self, lines: List[OrderedFieldMap], columns: Sequence[ColumnSpecification]) -> List[OrderedFieldMap]:
+        pass
+    
+    @abstractmethod
+    def iter_merged_entries(self, lines: Iterable[OrderedFieldMap], columns: Sequence[ColumnSpecification]) -> Iterator[OrderedFieldMap]:
         pass
\ No newline at end of file
@@ -0,0 +1,17 @@
+from array import array
+from dataclasses import dataclass
+from typing import List
+from .document import DocumentTemplate
+from .plan import ExtractionPlan
+from .token_table import TokenTable
+from .analysis import AdaptiveThresholds
+
+
+@dataclass
+class ExtractionContext:
+    template: DocumentTemplate
+    plan: ExtractionPlan
+    tokens: TokenTable
+    thresholds: AdaptiveThresholds
+    y_order: List[int]
+    reading_rank: array
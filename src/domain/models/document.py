@@ -1,9 +1,10 @@
-from dataclasses import dataclass
-from typing import List, Optional, Dict, Any
+from dataclasses import dataclass, field
+from typing import List, Optional, Dict, Any, Sequence, Tuple
 import json
+from .plan import ExtractionPlan, compile_extraction_plan
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class BoundingBox:
     x0: float
     y0: float
@@ -21,45 +22,62 @@ class BoundingBox:
         return mid_x >= self.x0 and mid_x <= self.x1 and mid_y >= self.y0 and mid_y <= self.y1
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class OCRToken:
     text: str
     bounding_box: BoundingBox
 
 
-@dataclass
+def _as_box(coords: Optional[Sequence[float]]) -> Optional[BoundingBox]:
+    if coords and len(coords) == 4:
+        return BoundingBox(coords[0], coords[1], coords[2], coords[3])
+    return None
+
+
+@dataclass(frozen=True, slots=True)
 class FieldSpecification:
     value: Optional[str] = None
-    token_bboxes: Optional[List[List[float]]] = None
-    bbox: Optional[List[float]] = None
+    token_bboxes: Optional[Tuple[Tuple[float, ...], ...]] = None
+    bbox: Optional[Tuple[float, ...]] = None
+    # Boxes are derived once; the specification is immutable, so callers share them
+    _box: Optional[BoundingBox] = field(init=False, repr=False, compare=False)
+    _token_boxes: Tuple[BoundingBox, ...] = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        object.__setattr__(self, '_box', _as_box(self.bbox))
+        token_boxes = (_as_box(coords) for coords in self.token_bboxes or ())
+        object.__setattr__(self, '_token_boxes', tuple(box for box in token_boxes if box is not None))
     
-    def get_bounding_box(self) -> tuple[Optional[BoundingBox], bool]:
-        if self.bbox and len(self.bbox) == 4:
-            return BoundingBox(self.bbox[0], self.bbox[1], self.bbox[2], self.bbox[3]), True
-        return None, False
+    def get_bounding_box(self) -> Tuple[Optional[BoundingBox], bool]:
+        return self._box, self._box is not None
     
-    def get_token_bounding_boxes(self) -> List[BoundingBox]:
-        if not self.token_bboxes:
-            return []
-        result = []
-        for coords in self.token_bboxes:
-            if len(coords) == 4:
-                result.append(BoundingBox(coords[0], coords[1], coords[2], coords[3]))
-        return result
+    def get_token_bounding_boxes(self) -> Tuple[BoundingBox, ...]:
+        return self._token_boxes
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ColumnSpecification:
     source: str
     canonical: str
-    bbox: List[float]
-    token_bboxes: Optional[List[List[float]]] = None
+    bbox: Tuple[float, ...]
+    token_bboxes: Optional[Tuple[Tuple[float, ...], ...]] = None
+    _box: BoundingBox = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        object.__setattr__(self, '_box', BoundingBox(self.bbox[0], self.bbox[1], self.bbox[2], self.bbox[3]))
     
     def get_bounding_box(self) -> BoundingBox:
-        return BoundingBox(self.bbox[0], self.bbox[1], self.bbox[2], self.bbox[3])
+        return self._box
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class DocumentTemplate:
     header: Dict[str, FieldSpecification]
-    columns: List[ColumnSpecification]
\ No newline at end of file
+    columns: List[ColumnSpecification]
+    # Compiled on first use and kept with the template, so cached templates carry their plan
+    _plan: Optional[ExtractionPlan] = field(default=None, init=False, repr=False, compare=False)
+    
+    def get_extraction_plan(self) -> ExtractionPlan:
+        if self._plan is None:
+            object.__setattr__(self, '_plan', compile_extraction_plan(self))
+        return self._plan
\ No newline at end of file
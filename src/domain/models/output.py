@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
 import json
 
 
@@ -31,9 +31,10 @@ class DocumentHeader:
         }
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class OrderedFieldMap:
-    keys: List[str]
+    # keys is shared by every line of a document; values stays a dict so merging can fill it in
+    keys: Tuple[str, ...]
     values: Dict[str, Optional[str]]
     
     def to_dict(self) -> Dict[str, Optional[str]]:
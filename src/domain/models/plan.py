@@ -0,0 +1,87 @@
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from .document import BoundingBox, ColumnSpecification, DocumentTemplate
+
+
+@dataclass(frozen=True, slots=True)
+class ColumnBand:
+    canonical_name: str
+    x0: float
+    x1: float
+
+
+@dataclass(frozen=True, slots=True)
+class HeaderQuery:
+    # A static value wins; otherwise tokens are read from the token boxes, then from the box
+    value: Optional[str]
+    token_boxes: Tuple['BoundingBox', ...]
+    box: Optional['BoundingBox']
+
+
+@dataclass(frozen=True, slots=True)
+class ExtractionPlan:
+    # Band edges depend on the per-document column stretch, so they are built on first use per stretch
+    columns: Tuple['ColumnSpecification', ...]
+    line_keys: Tuple[str, ...]
+    header_queries: Dict[str, HeaderQuery]
+    column_widths: Tuple[float, ...]
+    header_height: float
+    column_header_bottom: float
+    column_extent: Optional[Tuple[float, float]]
+    _bands: Dict[float, Tuple[ColumnBand, ...]] = field(default_factory=dict, init=False, repr=False, compare=False)
+    
+    def column_bands(self, column_stretch: float) -> Tuple[ColumnBand, ...]:
+        bands = self._bands.get(column_stretch)
+        if bands is None:
+            bands = self._bands.setdefault(column_stretch, build_column_bands(self.columns, column_stretch))
+        return bands
+
+
+def compile_extraction_plan(template: 'DocumentTemplate') -> ExtractionPlan:
+    columns = tuple(sorted(template.columns, key=lambda column: column.get_bounding_box().x0))
+    column_boxes = [column.get_bounding_box() for column in template.columns]
+    
+    header_queries = {}
+    header_bottoms = []
+    for key, specification in template.header.items():
+        box, has_box = specification.get_bounding_box()
+        if has_box:
+            header_bottoms.append(box.y1)
+        value = specification.value.strip() if specification.value else None
+        header_queries[key] = HeaderQuery(
+            value=value or None,
+            token_boxes=specification.get_token_bounding_boxes(),
+            box=box
+        )
+    
+    column_bottoms = [box.y1 for box in column_boxes]
+    return ExtractionPlan(
+        columns=columns,
+        line_keys=tuple(column.canonical for column in columns),
+        header_queries=header_queries,
+        column_widths=tuple(box.x1 - box.x0 for box in column_boxes),
+        header_height=max([0.0] + header_bottoms + column_bottoms),
+        column_header_bottom=max([0.0] + column_bottoms),
+        column_extent=(min([1.0] + [box.y0 for box in column_boxes]), max([0.0] + column_bottoms)) if column_boxes else None
+    )
+
+
+def build_column_bands(columns: Sequence['ColumnSpecification'], column_stretch: float) -> Tuple[ColumnBand, ...]:
+    # Each band runs from its column's x0 towards the next column, stretched but never overlapping it
+    bands = []
+    for i, column in enumerate(columns):
+        x0 = column.get_bounding_box().x0
+        x1 = 1.0
+        
+        if i < len(columns) - 1:
+            next_x0 = columns[i + 1].get_bounding_box().x0
+            x1 = x0 + column_stretch * (next_x0 - x0)
+            if x1 <= x0:
+                x1 = next_x0
+            if x1 > next_x0:
+                x1 = next_x0
+        
+        bands.append(ColumnBand(canonical_name=column.canonical, x0=x0, x1=x1))
+    return tuple(bands)
\ No newline at end of file
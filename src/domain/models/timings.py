@@ -0,0 +1,51 @@
+import time
+from typing import List, Optional, Tuple
+
+
+class StageTimings:
+    # Plain data, so it can be returned from a worker process
+    __slots__ = ("durations", "token_count", "line_count")
+    
+    def __init__(self):
+        self.durations: List[Tuple[str, float]] = []
+        self.token_count: Optional[int] = None
+        self.line_count: Optional[int] = None
+    
+    def add(self, stage: str, seconds: float) -> None:
+        self.durations.append((stage, seconds))
+
+
+class _StageTimer:
+    __slots__ = ("timings", "stage", "start")
+    
+    def __init__(self, timings: StageTimings, stage: str):
+        self.timings = timings
+        self.stage = stage
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.timings.add(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def time_stage(timings: Optional[StageTimings], stage: str):
+    # Without a timings object the shared no-op timer is returned, so disabled metrics cost one check
+    if timings is None:
+        return _NULL_TIMER
+    return _StageTimer(timings, stage)
\ No newline at end of file
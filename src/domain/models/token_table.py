@@ -0,0 +1,69 @@
+from array import array
+from typing import List, Sequence
+
+try:
+    import numpy
+except ImportError:  # NumPy is optional; the array module covers the pure Python path
+    numpy = None
+
+
+class TokenTable:
+    # Page boundaries are the index of the first token of every page after the first
+    def __init__(self):
+        self.texts: List[str] = []
+        self.x0 = array('d')
+        self.y0 = array('d')
+        self.x1 = array('d')
+        self.y1 = array('d')
+        self.mid_x = array('d')
+        self.mid_y = array('d')
+        self.page_starts = array('l')
+    
+    def append(self, text: str, x0: float, y0: float, x1: float, y1: float) -> None:
+        self.texts.append(text)
+        self.x0.append(x0)
+        self.y0.append(y0)
+        self.x1.append(x1)
+        self.y1.append(y1)
+        self.mid_x.append((x0 + x1) / 2)
+        self.mid_y.append((y0 + y1) / 2)
+    
+    def start_page(self) -> None:
+        # Called at a page separator; separators before the first token or after an empty page are ignored
+        token_count = len(self)
+        if token_count and (not self.page_starts or self.page_starts[-1] != token_count):
+            self.page_starts.append(token_count)
+    
+    def page_ranges(self) -> List[range]:
+        bounds = [0] + [start for start in self.page_starts if start < len(self)] + [len(self)]
+        return [range(start, end) for start, end in zip(bounds, bounds[1:])]
+    
+    def pages(self) -> List['TokenTable']:
+        ranges = self.page_ranges()
+        if len(ranges) <= 1:
+            return [self]
+        return [self.slice(page.start, page.stop) for page in ranges]
+    
+    def slice(self, start: int, end: int) -> 'TokenTable':
+        table = TokenTable()
+        table.texts = self.texts[start:end]
+        table.x0 = self.x0[start:end]
+        table.y0 = self.y0[start:end]
+        table.x1 = self.x1[start:end]
+        table.y1 = self.y1[start:end]
+        table.mid_x = self.mid_x[start:end]
+        table.mid_y = self.mid_y[start:end]
+        return table
+    
+    def __len__(self) -> int:
+        return len(self.texts)
+    
+    def texts_at(self, indices: Sequence[int]) -> List[str]:
+        texts = self.texts
+        return [texts[i] for i in indices]
+    
+    def vector(self, column: array):
+        # Zero-copy NumPy view of a coordinate column; the table must not grow while it is held
+        if numpy is None:
+            return column
+        return numpy.frombuffer(column, dtype=numpy.float64)
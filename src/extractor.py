@@ -0,0 +1,27 @@
+import functools
+from typing import Any, Union
+from .domain.models.output import ExtractionResult
+from .infrastructure.factory.document_extractor_factory import (
+    ExtractionRequest,
+    create_document_extractor,
+    get_shared_parsers,
+    run_document_extraction
+)
+
+
+EXTRACT_OPTIONS = ("page_executor", "timings")
+
+
+def extract(template_bytes: Union[bytes, str], ocr_text: Union[str, bytes], **options: Any) -> ExtractionResult:
+    # Raises ExtractionSetupError when an input cannot be parsed
+    unknown = set(options) - set(EXTRACT_OPTIONS)
+    if unknown:
+        raise TypeError(f"unknown extract option(s): {', '.join(sorted(unknown))}")
+    
+    timings = options.pop("timings", None)
+    extractor_factory = functools.partial(create_document_extractor, **options) if options else create_document_extractor
+    if isinstance(template_bytes, str):
+        template_bytes = template_bytes.encode('utf-8')
+    request = ExtractionRequest(template_data=template_bytes, ocr_data=ocr_text)
+    template_parser, ocr_parser = get_shared_parsers()
+    return run_document_extraction(extractor_factory, template_parser, ocr_parser, request, timings=timings)
\ No newline at end of file
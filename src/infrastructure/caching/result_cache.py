@@ -0,0 +1,226 @@
+import contextlib
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Union
+from ...domain.models.output import ExtractionResult
+from ..config.extraction_config import ExtractionConfiguration
+from ..factory.document_extractor_factory import ExtractionRequest
+from ..serialization.result_encoder import decode_extraction_result, encode_extraction_result
+
+
+# Part of every key; bump it when a change to the pipeline alters extraction output,
+# so results written to disk by an older version are no longer found
+CACHE_FORMAT_VERSION = 1
+HASH_CHUNK_BYTES = 1 << 20
+DISK_ENTRY_SUFFIX = ".json"
+# Stats that only ever grow; the others are current sizes and limits
+COUNTER_STATS = ("hits", "disk_hits", "misses")
+
+
+class ResultCache:
+    # Cached results are shared between requests and must not be mutated
+    def __init__(
+        self,
+        max_entries: int = 256,
+        directory: Optional[str] = None,
+        max_disk_bytes: int = 256 * 1024 * 1024,
+        configuration: Optional[ExtractionConfiguration] = None
+    ):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, ExtractionResult]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = DiskResultStore(directory, max_disk_bytes) if directory else None
+        self._key_prefix = self._fingerprint(configuration or ExtractionConfiguration())
+    
+    def compute_key(self, request: ExtractionRequest) -> Optional[str]:
+        # Unreadable inputs have no key; the extraction itself then reports the error
+        digest = hashlib.sha256(self._key_prefix)
+        try:
+            self._update_digest(digest, request.template_data, request.llm_template_path)
+            self._update_digest(digest, request.ocr_data, request.normalized_ocr_path)
+        except (OSError, TypeError, ValueError):
+            return None
+        return digest.hexdigest()
+    
+    def get(self, key: str) -> Optional[ExtractionResult]:
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return result
+        
+        data = self._disk.get(key) if self._disk is not None else None
+        if data is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        
+        try:
+            result = decode_extraction_result(data)
+        except Exception as e:
+            # A corrupt or truncated entry is dropped and treated as a miss
+            logging.warning(f"Discarding unreadable result cache entry {key}: {e}")
+            self._disk.discard(key)
+            with self._lock:
+                self.misses += 1
+            return None
+        
+        with self._lock:
+            self.disk_hits += 1
+        self._store_in_memory(key, result)
+        return result
+    
+    def put(self, key: str, result: ExtractionResult) -> None:
+        # Best effort: a failing disk tier must never fail the extraction that produced the result
+        self._store_in_memory(key, result)
+        if self._disk is not None:
+            try:
+                self._disk.put(key, encode_extraction_result(result))
+            except Exception as e:
+                logging.warning(f"Could not write result cache entry {key}: {e}")
+    
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries
+            }
+        if self._disk is not None:
+            stats.update(self._disk.stats())
+        return stats
+    
+    def _store_in_memory(self, key: str, result: ExtractionResult) -> None:
+        if self.max_entries == 0:
+            return
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def _update_digest(self, digest, data: Optional[Union[str, bytes]], path: Optional[str]) -> None:
+        # Each input is length-prefixed so the boundary between template and OCR bytes is unambiguous
+        if data is not None:
+            if isinstance(data, str):
+                data = data.encode('utf-8')
+            digest.update(len(data).to_bytes(8, 'big'))
+            digest.update(data)
+            return
+        
+        with open(path, 'rb') as f:
+            digest.update(os.fstat(f.fileno()).st_size.to_bytes(8, 'big'))
+            for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b''):
+                digest.update(chunk)
+    
+    def _fingerprint(self, configuration: ExtractionConfiguration) -> bytes:
+        return (
+            f"v{CACHE_FORMAT_VERSION}|{configuration.row_tolerance_y!r}|"
+            f"{configuration.column_stretch!r}|{configuration.header_padding_y!r}|"
+        ).encode('ascii')
+
+
+class DiskResultStore:
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._sizes: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+    
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            # Another process sharing the directory may have evicted it
+            self._forget(key)
+            return None
+        
+        with self._lock:
+            if key in self._sizes:
+                self._sizes.move_to_end(key)
+        return data
+    
+    def put(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        
+        # Write to a temporary file first so readers never see a partial entry
+        temporary_path = None
+        try:
+            descriptor, temporary_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(descriptor, 'wb') as f:
+                f.write(data)
+            os.replace(temporary_path, self._path(key))
+        except OSError as e:
+            logging.warning(f"Could not write result cache entry {key}: {e}")
+            if temporary_path is not None:
+                with contextlib.suppress(OSError):
+                    os.unlink(temporary_path)
+            return
+        
+        with self._lock:
+            self._total_bytes += len(data) - self._sizes.pop(key, 0)
+            self._sizes[key] = len(data)
+            evicted = self._evict()
+        for evicted_key in evicted:
+            with contextlib.suppress(OSError):
+                os.unlink(self._path(evicted_key))
+    
+    def discard(self, key: str) -> None:
+        with contextlib.suppress(OSError):
+            os.unlink(self._path(key))
+        self._forget(key)
+    
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "disk_entries": len(self._sizes),
+                "disk_bytes": self._total_bytes,
+                "max_disk_bytes": self.max_bytes
+            }
+    
+    def _evict(self) -> List[str]:
+        evicted = []
+        while self._total_bytes > self.max_bytes and self._sizes:
+            key, size = self._sizes.popitem(last=False)
+            self._total_bytes -= size
+            evicted.append(key)
+        return evicted
+    
+    def _forget(self, key: str) -> None:
+        with self._lock:
+            self._total_bytes -= self._sizes.pop(key, 0)
+    
+    def _load_index(self) -> None:
+        # Entries left by a previous run are ordered by last use (mtime is refreshed on every hit)
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith(DISK_ENTRY_SUFFIX):
+                stat = entry.stat()
+                entries.append((stat.st_mtime_ns, entry.name[:-len(DISK_ENTRY_SUFFIX)], stat.st_size))
+        
+        for _, key, size in sorted(entries):
+            self._sizes[key] = size
+            self._total_bytes += size
+        for key in self._evict():
+            with contextlib.suppress(OSError):
+                os.unlink(self._path(key))
+    
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + DISK_ENTRY_SUFFIX)
\ No newline at end of file
@@ -0,0 +1,58 @@
+import asyncio
+import contextlib
+import functools
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+
+class ExecutorSaturatedError(Exception):
+    def __init__(self, retry_after_seconds: int):
+        super().__init__("extraction queue is full")
+        self.retry_after_seconds = retry_after_seconds
+
+
+class BoundedExecutor:
+    # Jobs beyond max_concurrency running and max_queue waiting are rejected immediately
+    def __init__(self, executor: Executor, max_concurrency: int, max_queue: int, retry_after_seconds: int):
+        self.executor = executor
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.retry_after_seconds = retry_after_seconds
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._pending = 0
+    
+    async def run(self, function: Callable[..., Any], *args: Any) -> Any:
+        async with self.reserve():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, functools.partial(function, *args))
+    
+    async def run_async(self, coroutine_function: Callable[..., Awaitable[Any]], *args: Any) -> Any:
+        # Same admission control for work that schedules its own steps on the executor
+        async with self.reserve():
+            return await coroutine_function(*args)
+    
+    @contextlib.asynccontextmanager
+    async def reserve(self) -> AsyncIterator[None]:
+        # Holds one concurrency slot for the whole block, e.g. while a response streams
+        # Counters are only touched from the event loop thread, so no lock is needed
+        if self._pending >= self.max_concurrency + self.max_queue:
+            raise ExecutorSaturatedError(self.retry_after_seconds)
+        
+        self._pending += 1
+        try:
+            async with self._semaphore:
+                yield
+        finally:
+            self._pending -= 1
+    
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+def create_bounded_executor(kind: str, max_concurrency: int, max_queue: int, retry_after_seconds: int) -> BoundedExecutor:
+    if kind == "process":
+        executor = ProcessPoolExecutor(max_workers=max_concurrency)
+    else:
+        executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="extraction")
+    
+    return BoundedExecutor(executor, max_concurrency, max_queue, retry_after_seconds)
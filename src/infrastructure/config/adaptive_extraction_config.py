@@ -1,19 +1,12 @@
-from typing import List, Optional
-from ...domain.models.document import OCRToken, DocumentTemplate
+from typing import Optional
 from ...domain.models.analysis import AdaptiveThresholds
-from .document_analyzer_service import DocumentAnalyzerService
 from .extraction_config import ExtractionConfiguration
 
 
 class AdaptiveExtractionConfiguration:
-    def __init__(self):
-        self.analyzer = DocumentAnalyzerService()
+    def __init__(self, adaptive_thresholds: Optional[AdaptiveThresholds] = None):
         self.static_config = ExtractionConfiguration()
-        self.adaptive_thresholds: Optional[AdaptiveThresholds] = None
-    
-    def analyze_and_configure(self, tokens: List[OCRToken], template: DocumentTemplate) -> None:
-        characteristics = self.analyzer.analyze_document_characteristics(tokens, template)
-        self.adaptive_thresholds = self.analyzer.calculate_adaptive_thresholds(characteristics)
+        self.adaptive_thresholds: Optional[AdaptiveThresholds] = adaptive_thresholds
     
     def get_row_tolerance_y(self) -> float:
         if self.adaptive_thresholds:
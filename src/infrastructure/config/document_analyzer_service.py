@@ -1,25 +1,31 @@
 import math
-from typing import List, Dict
-from ...domain.models.document import OCRToken, DocumentTemplate
+from typing import List, Dict, Optional
+from ...domain.models.document import DocumentTemplate
+from ...domain.models.token_table import TokenTable
 from ...domain.models.analysis import DocumentCharacteristics, AdaptiveThresholds, DocumentRegions, DocumentRegion
+from ...domain.models.plan import ExtractionPlan
 
 
 class DocumentAnalyzerService:
     def __init__(self):
         pass
     
-    def analyze_document_characteristics(self, tokens: List[OCRToken], template: DocumentTemplate) -> DocumentCharacteristics:
+    def analyze_document_characteristics(self, tokens: TokenTable, template: DocumentTemplate, y_order: Optional[List[int]] = None) -> DocumentCharacteristics:
         if not tokens:
             return self._get_default_characteristics()
         
-        sorted_by_y = sorted(tokens, key=lambda t: t.bounding_box.mid_y())
+        if y_order is None:
+            sorted_by_y = sorted(tokens.mid_y)
+        else:
+            sorted_by_y = [tokens.mid_y[i] for i in y_order]
         
+        plan = template.get_extraction_plan()
         row_spacings = self._calculate_row_spacings(sorted_by_y)
-        column_widths = self._calculate_column_widths(template)
-        header_height = self._calculate_header_height(template)
+        column_widths = self._calculate_column_widths(plan)
+        header_height = plan.header_height
         density = self._calculate_document_density(tokens)
         variability = self._calculate_spacing_variability(row_spacings)
-        document_regions = self._analyze_document_regions(sorted_by_y, template)
+        document_regions = self._analyze_document_regions(sorted_by_y, plan)
         
         return DocumentCharacteristics(
             average_row_spacing=self._calculate_average(row_spacings),
@@ -50,13 +56,13 @@ class DocumentAnalyzerService:
             data_region_end=characteristics.document_regions.data_region.end_y
         )
     
-    def _calculate_row_spacings(self, sorted_tokens: List[OCRToken]) -> List[float]:
-        if len(sorted_tokens) < 2:
+    def _calculate_row_spacings(self, sorted_mid_y: List[float]) -> List[float]:
+        if len(sorted_mid_y) < 2:
             return [0.012]
         
         spacings = []
-        for i in range(1, len(sorted_tokens)):
-            spacing = abs(sorted_tokens[i].bounding_box.mid_y() - sorted_tokens[i-1].bounding_box.mid_y())
+        for i in range(1, len(sorted_mid_y)):
+            spacing = abs(sorted_mid_y[i] - sorted_mid_y[i-1])
             if spacing > 0.001:
                 spacings.append(spacing)
         
@@ -71,39 +77,18 @@ class DocumentAnalyzerService:
             return spacings
         return spacings[start:end]
     
-    def _calculate_column_widths(self, template: DocumentTemplate) -> List[float]:
-        if not template.columns:
+    def _calculate_column_widths(self, plan: ExtractionPlan) -> List[float]:
+        if not plan.column_widths:
             return [0.2]
-        
-        widths = []
-        for col in template.columns:
-            bbox = col.get_bounding_box()
-            widths.append(bbox.x1 - bbox.x0)
-        return widths
-    
-    def _calculate_header_height(self, template: DocumentTemplate) -> float:
-        max_y = 0.0
-        for field in template.header.values():
-            bbox, has_box = field.get_bounding_box()
-            if has_box and bbox:
-                if bbox.y1 > max_y:
-                    max_y = bbox.y1
-        
-        for col in template.columns:
-            bbox = col.get_bounding_box()
-            if bbox.y1 > max_y:
-                max_y = bbox.y1
-        
-        return max_y
+        return list(plan.column_widths)
     
-    def _calculate_document_density(self, tokens: List[OCRToken]) -> float:
+    def _calculate_document_density(self, tokens: TokenTable) -> float:
         if not tokens:
             return 0.5
         
         total_area = 0.0
-        for token in tokens:
-            bbox = token.bounding_box
-            area = (bbox.x1 - bbox.x0) * (bbox.y1 - bbox.y0)
+        for x0, y0, x1, y1 in zip(tokens.x0, tokens.y0, tokens.x1, tokens.y1):
+            area = (x1 - x0) * (y1 - y0)
             total_area += area
         
         return total_area / 1.0
@@ -116,16 +101,15 @@ class DocumentAnalyzerService:
         variance = sum((s - mean) ** 2 for s in spacings) / len(spacings)
         return math.sqrt(variance) / mean
     
-    def _estimate_line_count(self, sorted_tokens: List[OCRToken]) -> int:
-        if not sorted_tokens:
+    def _estimate_line_count(self, sorted_mid_y: List[float]) -> int:
+        if not sorted_mid_y:
             return 0
         
-        current_y = sorted_tokens[0].bounding_box.mid_y()
+        current_y = sorted_mid_y[0]
         line_count = 1
         tolerance = 0.01
         
-        for token in sorted_tokens[1:]:
-            token_y = token.bounding_box.mid_y()
+        for token_y in sorted_mid_y[1:]:
             if abs(token_y - current_y) > tolerance:
                 line_count += 1
                 current_y = token_y
@@ -204,12 +188,12 @@ class DocumentAnalyzerService:
             )
         )
     
-    def _analyze_document_regions(self, tokens: List[OCRToken], template: DocumentTemplate) -> DocumentRegions:
-        if not tokens:
+    def _analyze_document_regions(self, sorted_mid_y: List[float], plan: ExtractionPlan) -> DocumentRegions:
+        if not sorted_mid_y:
             return self._get_default_characteristics().document_regions
         
-        buckets = self._analyze_token_distribution(tokens)
-        column_start, column_end = self._get_column_boundaries(template)
+        buckets = self._analyze_token_distribution(sorted_mid_y)
+        column_start, column_end = self._get_column_boundaries(plan)
         
         header_region = self._detect_header_region(buckets, column_start)
         data_region = self._detect_data_region(buckets, column_start, column_end)
@@ -221,25 +205,18 @@ class DocumentAnalyzerService:
             footer_region=footer_region
         )
     
-    def _analyze_token_distribution(self, tokens: List[OCRToken]) -> Dict[int, int]:
+    def _analyze_token_distribution(self, mid_y: List[float]) -> Dict[int, int]:
         buckets = {}
-        for token in tokens:
-            y_bucket = int(token.bounding_box.mid_y() * 100)
+        for token_y in mid_y:
+            y_bucket = int(token_y * 100)
             buckets[y_bucket] = buckets.get(y_bucket, 0) + 1
         return buckets
     
-    def _get_column_boundaries(self, template: DocumentTemplate) -> tuple[float, float]:
-        if not template.columns:
+    def _get_column_boundaries(self, plan: ExtractionPlan) -> tuple[float, float]:
+        if plan.column_extent is None:
             return 0.25, 0.80
         
-        min_y = 1.0
-        max_y = 0.0
-        
-        for col in template.columns:
-            bbox = col.get_bounding_box()
-            min_y = min(min_y, bbox.y0)
-            max_y = max(max_y, bbox.y1)
-        
+        min_y, max_y = plan.column_extent
         return min_y, max_y + 0.05
     
     def _detect_header_region(self, buckets: Dict[int, int], column_start: float) -> DocumentRegion:
@@ -0,0 +1,28 @@
+from typing import Optional
+from ...domain.models.document import DocumentTemplate
+from ...domain.models.token_table import TokenTable
+from ...domain.models.context import ExtractionContext
+from ...utils.reading_order import sort_indices_by_y, compute_reading_rank
+from .document_analyzer_service import DocumentAnalyzerService
+
+
+def create_extraction_context(
+    template: DocumentTemplate,
+    tokens: TokenTable,
+    analyzer: Optional[DocumentAnalyzerService] = None
+) -> ExtractionContext:
+    # Analyze and order the document once; every service of the request reads from the context
+    analyzer = analyzer or DocumentAnalyzerService()
+    y_order = sort_indices_by_y(tokens)
+    characteristics = analyzer.analyze_document_characteristics(tokens, template, y_order)
+    thresholds = analyzer.calculate_adaptive_thresholds(characteristics)
+    reading_rank = compute_reading_rank(tokens, y_order, thresholds.row_tolerance_y)
+    
+    return ExtractionContext(
+        template=template,
+        plan=template.get_extraction_plan(),
+        tokens=tokens,
+        thresholds=thresholds,
+        y_order=y_order,
+        reading_rank=reading_rank
+    )
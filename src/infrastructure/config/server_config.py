@@ -0,0 +1,46 @@
+import os
+
+
+class ServerConfiguration:
+    def __init__(self):
+        cpu_count = os.cpu_count() or 1
+        self.batch_max_workers = self._get_environment_int("BATCH_MAX_WORKERS", cpu_count)
+        self.extract_executor = self._get_environment_choice("EXTRACT_EXECUTOR", ("thread", "process"), "thread")
+        self.extract_max_concurrency = self._get_environment_int("EXTRACT_MAX_CONCURRENCY", cpu_count)
+        self.extract_max_queue = self._get_environment_int("EXTRACT_MAX_QUEUE", 32, allow_zero=True)
+        self.extract_retry_after = self._get_environment_int("EXTRACT_RETRY_AFTER", 1)
+        self.extract_read_ahead = self._get_environment_bool("EXTRACT_READ_AHEAD", False)
+        self.page_max_workers = self._get_environment_int("PAGE_MAX_WORKERS", 0, allow_zero=True)
+        self.metrics_enabled = self._get_environment_bool("METRICS_ENABLED", True)
+        self.profile_dir = os.getenv("PROFILE_DIR", "").strip()
+        self.profile_sample_every = self._get_environment_int("PROFILE_SAMPLE_EVERY", 0, allow_zero=True)
+        self.profile_header_enabled = self._get_environment_bool("PROFILE_HEADER_ENABLED", True)
+        self.template_cache_size = self._get_environment_int("TEMPLATE_CACHE_SIZE", 128, allow_zero=True)
+        self.template_preload_dir = os.getenv("TEMPLATE_PRELOAD_DIR", "").strip()
+        self.result_cache_size = self._get_environment_int("RESULT_CACHE_SIZE", 64, allow_zero=True)
+        self.result_cache_dir = os.getenv("RESULT_CACHE_DIR", "").strip()
+        self.result_cache_max_mb = self._get_environment_int("RESULT_CACHE_MAX_MB", 256)
+    
+    def _get_environment_int(self, key: str, default_value: int, allow_zero: bool = False) -> int:
+        value = os.getenv(key, "").strip()
+        if not value:
+            return default_value
+        try:
+            parsed = int(value)
+        except ValueError:
+            return default_value
+        if parsed > 0 or (allow_zero and parsed == 0):
+            return parsed
+        return default_value
+    
+    def _get_environment_bool(self, key: str, default_value: bool) -> bool:
+        value = os.getenv(key, "").strip().lower()
+        if value in ("1", "true", "yes", "on"):
+            return True
+        if value in ("0", "false", "no", "off"):
+            return False
+        return default_value
+    
+    def _get_environment_choice(self, key: str, choices: tuple, default_value: str) -> str:
+        value = os.getenv(key, "").strip().lower()
+        return value if value in choices else default_value
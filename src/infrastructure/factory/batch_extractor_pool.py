@@ -0,0 +1,62 @@
+import json
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional, Tuple
+from ...domain.models.timings import StageTimings, time_stage
+from ..serialization.result_encoder import encode_extraction_result
+from .document_extractor_factory import ExtractionRequest, create_document_extractor, get_shared_parsers
+
+
+def extract_batch_item(request: ExtractionRequest) -> Dict[str, Any]:
+    template_parser, ocr_parser = get_shared_parsers()
+    try:
+        extractor = create_document_extractor(template_parser, ocr_parser, request)
+    except Exception as e:
+        return {"status": 400, "error": f"extraction setup failed: {str(e)}"}
+    
+    try:
+        return {"status": 200, "result": extractor.extract_document().to_dict()}
+    except Exception as e:
+        return {"status": 500, "error": f"Internal server error: {str(e)}"}
+
+
+def extract_batch_line(item_id: str, request: ExtractionRequest) -> Tuple[int, str, StageTimings]:
+    # Encodes the JSON Lines record in the worker so the parent process only writes text
+    timings = StageTimings()
+    prefix = '{"id":' + json.dumps(item_id, ensure_ascii=False)
+    template_parser, ocr_parser = get_shared_parsers()
+    try:
+        extractor = create_document_extractor(template_parser, ocr_parser, request, timings=timings)
+    except Exception as e:
+        return 400, prefix + ',"status":400,"error":' + json.dumps(f"extraction setup failed: {str(e)}") + '}', timings
+    
+    try:
+        result = extractor.extract_document()
+        with time_stage(timings, "serialize"):
+            encoded = encode_extraction_result(result).decode('utf-8')
+    except Exception as e:
+        return 500, prefix + ',"status":500,"error":' + json.dumps(f"Internal server error: {str(e)}") + '}', timings
+    
+    return 200, prefix + ',"status":200,"result":' + encoded + '}', timings
+
+
+class BatchExtractorPool:
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+    
+    def submit(self, request: ExtractionRequest) -> Future:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        try:
+            return self._executor.submit(extract_batch_item, request)
+        except BrokenProcessPool:
+            # A worker died (crash or OOM kill) and took the pool with it; start a fresh one
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._executor.submit(extract_batch_item, request)
+    
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
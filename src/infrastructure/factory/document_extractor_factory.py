@@ -1,51 +1,288 @@
+import json
 import os
+import threading
+from concurrent.futures import Executor
 from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, Tuple, Union
 from ...domain.interfaces.parser import DocumentTemplateParser, OCRDataParser, DocumentExtractor
+from ...domain.models.document import DocumentTemplate
+from ...domain.models.token_table import TokenTable
+from ...domain.models.output import DocumentHeader, ExtractionResult, OrderedFieldMap
+from ...domain.models.timings import StageTimings, time_stage
 from ...application.services.document_extractor_service import DocumentExtractorService
 from ...application.services.header_extractor_service import HeaderExtractorService
 from ...application.services.line_extractor_service import LineExtractorService
 from ...application.services.line_processor_service import LineProcessorService
+from ...application.services.paged_line_extractor_service import PagedLineExtractorService
 from ...application.services.token_matcher_service import TokenMatcherService
-from ...infrastructure.config.adaptive_extraction_config import AdaptiveExtractionConfiguration
+from ...infrastructure.config.extraction_context import create_extraction_context
+from ...infrastructure.config.server_config import ServerConfiguration
+from ...infrastructure.parsers.cached_document_template_parser import CachedDocumentTemplateParser
+from ...infrastructure.parsers.document_template_parser import DocumentTemplateParserImpl
+from ...infrastructure.parsers.ocr_data_parser import OCRDataParserImpl
+
+
+_shared_parsers: Optional[Tuple[CachedDocumentTemplateParser, OCRDataParser]] = None
+_shared_parsers_lock = threading.Lock()
 
 
 class ExtractionRequest:
-    def __init__(self, llm_res_txt: str, new_ocr_coord_json: str):
+    def __init__(
+        self,
+        llm_res_txt: Optional[str] = None,
+        new_ocr_coord_json: Optional[str] = None,
+        template_data: Optional[bytes] = None,
+        ocr_data: Optional[Union[str, bytes]] = None
+    ):
         self.llm_template_path = llm_res_txt
         self.normalized_ocr_path = new_ocr_coord_json
+        self.template_data = template_data
+        self.ocr_data = ocr_data
+    
+    @classmethod
+    def from_payload(cls, payload: Any) -> Optional['ExtractionRequest']:
+        # Each input is given either as a file path or inline; inline content wins when both are present
+        if not isinstance(payload, dict):
+            return None
+        
+        template_data = cls._encode_template(payload.get('llm_res_content'))
+        ocr_data = payload.get('new_ocr_coord_content')
+        
+        if template_data is None and 'llm_res_txt' not in payload:
+            return None
+        if ocr_data is None and 'new_ocr_coord_json' not in payload:
+            return None
+        
+        return cls(
+            llm_res_txt=payload.get('llm_res_txt'),
+            new_ocr_coord_json=payload.get('new_ocr_coord_json'),
+            template_data=template_data,
+            ocr_data=ocr_data
+        )
+    
+    @staticmethod
+    def _encode_template(content: Any) -> Optional[bytes]:
+        if content is None:
+            return None
+        if isinstance(content, bytes):
+            return content
+        if isinstance(content, str):
+            return content.encode('utf-8')
+        return json.dumps(content).encode('utf-8')
+
+
+class ExtractionSetupError(Exception):
+    pass
 
 
 def create_document_extractor(
     template_parser: DocumentTemplateParser, 
     ocr_parser: OCRDataParser, 
-    request: ExtractionRequest
+    request: ExtractionRequest,
+    page_executor: Optional[Executor] = None,
+    timings: Optional[StageTimings] = None
 ) -> DocumentExtractor:
+
+    with time_stage(timings, "template_load"):
+        template = load_document_template(template_parser, request)
+    with time_stage(timings, "ocr_load"):
+        tokens = load_ocr_tokens(ocr_parser, request)
     
-    # Read template file
-    template_path = Path(request.llm_template_path)
-    with open(template_path, 'rb') as f:
-        template_data = f.read()
+    return build_document_extractor(template, tokens, page_executor, timings)
+
+
+async def create_document_extractor_async(
+    template_parser: DocumentTemplateParser, 
+    ocr_parser: OCRDataParser, 
+    request: ExtractionRequest,
+    executor: Optional[Executor] = None,
+    read_ahead: bool = False,
+    page_executor: Optional[Executor] = None,
+    timings: Optional[StageTimings] = None
+) -> DocumentExtractor:
+    # asyncio is imported where it is used: the event loop has already loaded it, and
+    # synchronous callers (library, CLI, worker processes) skip its import cost
+    import asyncio
+    loop = asyncio.get_running_loop()
     
-    template = template_parser.parse_document_template(template_data)
+    # Load both inputs concurrently so template parsing overlaps the OCR file read
+    template, tokens = await asyncio.gather(
+        loop.run_in_executor(executor, _run_stage, timings, "template_load", load_document_template, template_parser, request, read_ahead),
+        loop.run_in_executor(executor, _run_stage, timings, "ocr_load", load_ocr_tokens, ocr_parser, request, read_ahead)
+    )
     
-    # Read OCR data file
-    ocr_path = Path(request.normalized_ocr_path)
-    with open(ocr_path, 'r', encoding='utf-8') as f:
-        ocr_data = f.read()
+    return await loop.run_in_executor(executor, build_document_extractor, template, tokens, page_executor, timings)
+
+
+def _run_stage(timings: Optional[StageTimings], stage: str, function: Callable[..., Any], *args: Any) -> Any:
+    with time_stage(timings, stage):
+        return function(*args)
+
+
+def load_document_template(
+    template_parser: DocumentTemplateParser,
+    request: ExtractionRequest,
+    read_ahead: bool = False
+) -> DocumentTemplate:
+    # Parse inline template or read template file
+    if request.template_data is not None:
+        return template_parser.parse_document_template(request.template_data)
+    
+    template_path = Path(request.llm_template_path)
+    if read_ahead:
+        advise_read_ahead(template_path)
+    return template_parser.parse_document_template_file(template_path)
+
+
+def load_ocr_tokens(
+    ocr_parser: OCRDataParser,
+    request: ExtractionRequest,
+    read_ahead: bool = False
+) -> TokenTable:
+    # Parse inline OCR data or stream OCR data file
+    if request.ocr_data is not None:
+        ocr_data = request.ocr_data
+        if isinstance(ocr_data, bytes):
+            ocr_data = ocr_data.decode('utf-8')
+        return ocr_parser.parse_ocr_tokens(ocr_data)
     
-    tokens = ocr_parser.parse_ocr_tokens(ocr_data)
+    ocr_path = Path(request.normalized_ocr_path)
+    if read_ahead:
+        advise_read_ahead(ocr_path)
+    return ocr_parser.parse_ocr_file(ocr_path)
+
+
+def advise_read_ahead(path: Path) -> None:
+    # Ask the kernel to prefetch the whole file; only a hint, so any failure is ignored
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def build_document_extractor(
+    template: DocumentTemplate,
+    tokens: TokenTable,
+    page_executor: Optional[Executor] = None,
+    timings: Optional[StageTimings] = None
+) -> DocumentExtractor:
+    # Analyze the document once and share the result with every service
+    with time_stage(timings, "analysis"):
+        context = create_extraction_context(template, tokens)
+    if timings is not None:
+        timings.token_count = len(tokens)
     
     # Create token matcher
     token_matcher = TokenMatcherService(tokens)
     
-    # Create adaptive config to get row tolerance
-    adaptive_config = AdaptiveExtractionConfiguration()
-    adaptive_config.analyze_and_configure(tokens, template)
-    row_tolerance = adaptive_config.get_row_tolerance_y()
-    
-    # Create extractors
-    header_extractor = HeaderExtractorService(template, token_matcher, row_tolerance)
+    # Create extractors; multi-page documents get their line table extracted page by page
+    header_extractor = HeaderExtractorService(context, token_matcher)
     line_processor = LineProcessorService()
-    line_extractor = LineExtractorService(template, tokens, line_processor)
+    pages = tokens.pages()
+    if len(pages) > 1:
+        page_mapper = page_executor.map if page_executor is not None else map
+        line_extractor = PagedLineExtractorService(template, pages, line_processor, page_mapper, timings)
+    else:
+        line_extractor = LineExtractorService(context, line_processor, timings)
+    
+    return DocumentExtractorService(header_extractor, line_extractor, timings)
+
+
+def _factory_options(timings: Optional[StageTimings], **options: Any) -> Dict[str, Any]:
+    # timings is passed only when requested, so injected factories without that parameter keep working
+    if timings is not None:
+        options["timings"] = timings
+    return options
+
+
+def run_document_extraction(
+    extractor_factory: Callable[..., DocumentExtractor],
+    template_parser: DocumentTemplateParser,
+    ocr_parser: OCRDataParser,
+    request: ExtractionRequest,
+    timings: Optional[StageTimings] = None
+) -> ExtractionResult:
+    try:
+        extractor = extractor_factory(template_parser, ocr_parser, request, **_factory_options(timings))
+    except Exception as e:
+        raise ExtractionSetupError(str(e)) from e
+    
+    return extractor.extract_document()
+
+
+def run_timed_document_extraction(
+    extractor_factory: Callable[..., DocumentExtractor],
+    template_parser: DocumentTemplateParser,
+    ocr_parser: OCRDataParser,
+    request: ExtractionRequest
+) -> Tuple[ExtractionResult, StageTimings]:
+    # Returns the timings with the result so they survive the trip back from a worker process
+    timings = StageTimings()
+    return run_document_extraction(extractor_factory, template_parser, ocr_parser, request, timings), timings
+
+
+async def run_document_extraction_async(
+    extractor_factory: Callable[..., Awaitable[DocumentExtractor]],
+    template_parser: DocumentTemplateParser,
+    ocr_parser: OCRDataParser,
+    request: ExtractionRequest,
+    executor: Optional[Executor] = None,
+    timings: Optional[StageTimings] = None
+) -> ExtractionResult:
+    try:
+        extractor = await extractor_factory(template_parser, ocr_parser, request, **_factory_options(timings, executor=executor))
+    except Exception as e:
+        raise ExtractionSetupError(str(e)) from e
+    
+    import asyncio
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, extractor.extract_document)
+
+
+async def start_document_extraction_stream(
+    extractor_factory: Callable[..., Awaitable[DocumentExtractor]],
+    template_parser: DocumentTemplateParser,
+    ocr_parser: OCRDataParser,
+    request: ExtractionRequest,
+    executor: Optional[Executor] = None,
+    timings: Optional[StageTimings] = None
+) -> Tuple[DocumentHeader, Iterator[OrderedFieldMap]]:
+    # Extracts the header and returns the lines as a lazy iterator; advance it on the same executor
+    try:
+        extractor = await extractor_factory(template_parser, ocr_parser, request, **_factory_options(timings, executor=executor))
+    except Exception as e:
+        raise ExtractionSetupError(str(e)) from e
     
-    return DocumentExtractorService(header_extractor, line_extractor)
\ No newline at end of file
+    import asyncio
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, _start_extraction_stream, extractor, timings)
+
+
+def _start_extraction_stream(
+    extractor: DocumentExtractor,
+    timings: Optional[StageTimings]
+) -> Tuple[DocumentHeader, Iterator[OrderedFieldMap]]:
+    with time_stage(timings, "header"):
+        header = extractor.extract_header()
+    return header, extractor.iter_lines()
+
+
+def get_shared_parsers() -> Tuple[CachedDocumentTemplateParser, OCRDataParser]:
+    # One template cache per process for the library API and batch workers, built on first use
+    global _shared_parsers
+    with _shared_parsers_lock:
+        if _shared_parsers is None:
+            template_parser = CachedDocumentTemplateParser(
+                DocumentTemplateParserImpl(),
+                max_entries=ServerConfiguration().template_cache_size
+            )
+            _shared_parsers = (template_parser, OCRDataParserImpl())
+        return _shared_parsers
\ No newline at end of file
@@ -0,0 +1,84 @@
+import threading
+from bisect import bisect_left
+from typing import Callable, Collection, Dict, List, Tuple
+from ...domain.models.timings import StageTimings
+
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+    
+    def observe(self, value: float) -> None:
+        # Buckets are upper bounds; the extra last slot is +Inf
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.stage_histograms: Dict[str, Histogram] = {}
+        self.gauges: Dict[str, float] = {}
+        self.collectors: List[Tuple[str, Callable[[], Dict[str, float]], Collection[str]]] = []
+        self._lock = threading.Lock()
+    
+    def add_collector(self, prefix: str, collect: Callable[[], Dict[str, float]], counters: Collection[str] = ()) -> None:
+        # collect() is called on every scrape; each entry is rendered as <prefix>_<name>,
+        # as a counter when its name is listed in counters and as a gauge otherwise
+        with self._lock:
+            self.collectors.append((prefix, collect, counters))
+    
+    def record(self, timings: StageTimings) -> None:
+        with self._lock:
+            for stage, seconds in timings.durations:
+                histogram = self.stage_histograms.get(stage)
+                if histogram is None:
+                    histogram = self.stage_histograms[stage] = Histogram(self.buckets)
+                histogram.observe(seconds)
+            if timings.token_count is not None:
+                self.gauges["extraction_tokens"] = timings.token_count
+            if timings.line_count is not None:
+                self.gauges["extraction_lines"] = timings.line_count
+    
+    def render_prometheus(self) -> str:
+        with self._lock:
+            lines = [
+                "# HELP extraction_stage_seconds Time spent in each extraction stage.",
+                "# TYPE extraction_stage_seconds histogram"
+            ]
+            for stage in sorted(self.stage_histograms):
+                histogram = self.stage_histograms[stage]
+                cumulative = 0
+                for bound, count in zip(self.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f'extraction_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'extraction_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {histogram.count}')
+                lines.append(f'extraction_stage_seconds_sum{{stage="{stage}"}} {histogram.total!r}')
+                lines.append(f'extraction_stage_seconds_count{{stage="{stage}"}} {histogram.count}')
+            
+            lines.append("# HELP extraction_tokens OCR tokens in the last extracted document.")
+            lines.append("# TYPE extraction_tokens gauge")
+            lines.append(f"extraction_tokens {self.gauges.get('extraction_tokens', 0)}")
+            lines.append("# HELP extraction_lines Lines in the last extracted document.")
+            lines.append("# TYPE extraction_lines gauge")
+            lines.append(f"extraction_lines {self.gauges.get('extraction_lines', 0)}")
+            collectors = list(self.collectors)
+        
+        for prefix, collect, counters in collectors:
+            for name, value in sorted(collect().items()):
+                if name in counters:
+                    metric = f"{prefix}_{name}_total"
+                    lines.append(f"# TYPE {metric} counter")
+                else:
+                    metric = f"{prefix}_{name}"
+                    lines.append(f"# TYPE {metric} gauge")
+                lines.append(f"{metric} {value}")
+        
+        return "\n".join(lines) + "\n"
\ No newline at end of file
@@ -0,0 +1,96 @@
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Hashable, Tuple, Union
+from ...domain.interfaces.parser import DocumentTemplateParser
+from ...domain.models.document import DocumentTemplate
+
+
+class CachedDocumentTemplateParser(DocumentTemplateParser):
+    # Cached templates are shared between requests and must not be mutated
+    def __init__(self, parser: DocumentTemplateParser, max_entries: int = 128):
+        self.parser = parser
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, DocumentTemplate]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def parse_document_template(self, data: bytes) -> DocumentTemplate:
+        key = ("sha256", hashlib.sha256(data).hexdigest())
+        template = self._lookup(key)
+        if template is None:
+            template = self.parser.parse_document_template(data)
+            self._store(key, template)
+        return template
+    
+    def parse_document_template_file(self, path: Union[str, Path]) -> DocumentTemplate:
+        resolved_path = os.path.realpath(path)
+        stat = os.stat(resolved_path)
+        key = ("file", resolved_path, stat.st_mtime_ns, stat.st_size)
+        template = self._lookup(key)
+        if template is None:
+            template = self.parser.parse_document_template_file(resolved_path)
+            self._store(key, template)
+        return template
+    
+    def __reduce__(self):
+        # Unpickling in a worker process yields that process's shared cache instead of a
+        # throwaway copy, so process executors keep their cache across calls
+        return _get_process_cache, (self.parser, self.max_entries)
+    
+    def preload_directory(self, directory: Union[str, Path], pattern: str = "*.json") -> int:
+        # A template that fails to parse is logged and skipped rather than stopping startup
+        loaded = 0
+        for path in sorted(Path(directory).glob(pattern)):
+            if not path.is_file():
+                continue
+            try:
+                self.parse_document_template_file(path)
+            except Exception as e:
+                logging.warning(f"Skipping template {path} that failed to preload: {e}")
+                continue
+            loaded += 1
+        return loaded
+    
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries
+            }
+    
+    def _lookup(self, key: Hashable):
+        with self._lock:
+            template = self._entries.get(key)
+            if template is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return template
+    
+    def _store(self, key: Hashable, template: DocumentTemplate) -> None:
+        with self._lock:
+            self._entries[key] = template
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+
+_process_caches: Dict[Tuple[type, int], CachedDocumentTemplateParser] = {}
+_process_caches_lock = threading.Lock()
+
+
+def _get_process_cache(parser: DocumentTemplateParser, max_entries: int) -> CachedDocumentTemplateParser:
+    key = (type(parser), max_entries)
+    with _process_caches_lock:
+        if key not in _process_caches:
+            _process_caches[key] = CachedDocumentTemplateParser(parser, max_entries)
+        return _process_caches[key]
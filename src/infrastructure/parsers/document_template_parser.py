@@ -1,4 +1,7 @@
 import json
+import sys
+from pathlib import Path
+from typing import Any, Optional, Tuple, Union
 from ...domain.interfaces.parser import DocumentTemplateParser
 from ...domain.models.document import DocumentTemplate, FieldSpecification, ColumnSpecification
 
@@ -7,6 +10,10 @@ class DocumentTemplateParserImpl(DocumentTemplateParser):
     def __init__(self):
         pass
     
+    def parse_document_template_file(self, path: Union[str, Path]) -> DocumentTemplate:
+        with open(path, 'rb') as f:
+            return self.parse_document_template(f.read())
+    
     def parse_document_template(self, data: bytes) -> DocumentTemplate:
         template_data = json.loads(data.decode('utf-8'))
         
@@ -15,10 +22,10 @@ class DocumentTemplateParserImpl(DocumentTemplateParser):
         if 'header' in template_data and template_data['header'] is not None:
             for key, field_data in template_data['header'].items():
                 if field_data is not None:
-                    header[key] = FieldSpecification(
+                    header[sys.intern(key)] = FieldSpecification(
                         value=field_data.get('value'),
-                        token_bboxes=field_data.get('token_bboxes'),
-                        bbox=field_data.get('bbox')
+                        token_bboxes=self._freeze_boxes(field_data.get('token_bboxes')),
+                        bbox=self._freeze_box(field_data.get('bbox'))
                     )
         
         # Parse columns
@@ -26,11 +33,20 @@ class DocumentTemplateParserImpl(DocumentTemplateParser):
         if 'columns' in template_data and template_data['columns'] is not None:
             for col_data in template_data['columns']:
                 if col_data is not None:
+                    # Canonical names become the keys of every extracted line, so they are interned
                     columns.append(ColumnSpecification(
-                        source=col_data['source'],
-                        canonical=col_data['canonical'],
-                        bbox=col_data['bbox'],
-                        token_bboxes=col_data.get('token_bboxes')
+                        source=sys.intern(col_data['source']),
+                        canonical=sys.intern(col_data['canonical']),
+                        bbox=self._freeze_box(col_data['bbox']),
+                        token_bboxes=self._freeze_boxes(col_data.get('token_bboxes'))
                     ))
         
-        return DocumentTemplate(header=header, columns=columns)
\ No newline at end of file
+        return DocumentTemplate(header=header, columns=columns)
+    
+    def _freeze_box(self, coords: Any) -> Optional[Tuple[float, ...]]:
+        return tuple(coords) if isinstance(coords, list) else coords
+    
+    def _freeze_boxes(self, boxes: Any) -> Optional[Tuple[Tuple[float, ...], ...]]:
+        if not isinstance(boxes, list):
+            return boxes
+        return tuple(self._freeze_box(coords) for coords in boxes)
\ No newline at end of file
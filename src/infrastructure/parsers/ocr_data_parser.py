@@ -1,45 +1,84 @@
+import mmap
+import os
 import re
-from typing import List
+import sys
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Tuple, Union
 from ...domain.interfaces.parser import OCRDataParser
-from ...domain.models.document import OCRToken, BoundingBox
+from ...domain.models.token_table import TokenTable
 
 
 class OCRDataParserImpl(OCRDataParser):
     def __init__(self):
         self.ocr_line_pattern = re.compile(r'^(.*?)\s*\|\s*\[(.*?)\]\s*$')
     
-    def parse_ocr_tokens(self, data: str) -> List[OCRToken]:
-        tokens = []
-        lines = data.strip().split('\n')
-        
+    def parse_ocr_tokens(self, data: str) -> TokenTable:
+        return self._collect_tokens(self._split_lines(data))
+    
+    def parse_ocr_file(self, path: Union[str, Path]) -> TokenTable:
+        # Map the file and decode one line at a time so peak memory is bounded by the token table
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return TokenTable()
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return self._collect_tokens(self._decode_lines(iter(mapped.readline, b'')))
+    
+    def _collect_tokens(self, lines: Iterable[str]) -> TokenTable:
+        # '###' lines separate pages; they are only checked for once a line fails to parse
+        tokens = TokenTable()
         for line in lines:
-            line = line.strip()
-            if not line or line.startswith('###'):
-                continue
-            
-            match = self.ocr_line_pattern.match(line)
-            if not match:
-                continue
-            
-            text = match.group(1).strip()
-            coordinates_str = match.group(2)
-            coordinates = [coord.strip() for coord in coordinates_str.split(',')]
-            
-            if len(coordinates) != 4:
-                continue
-            
-            try:
-                x0 = float(coordinates[0])
-                y0 = float(coordinates[1])
-                x1 = float(coordinates[2])
-                y1 = float(coordinates[3])
-                
-                token = OCRToken(
-                    text=text,
-                    bounding_box=BoundingBox(x0=x0, y0=y0, x1=x1, y1=y1)
-                )
-                tokens.append(token)
-            except ValueError:
-                continue
+            token = self._parse_line(line)
+            if token is not None:
+                tokens.append(*token)
+            elif self._is_page_separator(line):
+                tokens.start_page()
+        return tokens
+    
+    def _parse_line(self, line: str) -> Optional[Tuple[str, float, float, float, float]]:
+        line = line.strip()
+        if not line or line.startswith('###'):
+            return None
+        
+        match = self.ocr_line_pattern.match(line)
+        if not match:
+            return None
+        
+        # Statements repeat the same short texts ('$', dates, column titles), so one copy is kept per text
+        text = sys.intern(match.group(1).strip())
+        coordinates_str = match.group(2)
+        coordinates = [coord.strip() for coord in coordinates_str.split(',')]
         
-        return tokens
\ No newline at end of file
+        if len(coordinates) != 4:
+            return None
+        
+        try:
+            x0 = float(coordinates[0])
+            y0 = float(coordinates[1])
+            x1 = float(coordinates[2])
+            y1 = float(coordinates[3])
+        except ValueError:
+            return None
+        
+        return text, x0, y0, x1, y1
+    
+    def _is_page_separator(self, line: str) -> bool:
+        return line.lstrip().startswith('###')
+    
+    def _split_lines(self, data: str) -> Iterator[str]:
+        start = 0
+        while True:
+            end = data.find('\n', start)
+            if end < 0:
+                yield data[start:]
+                return
+            yield data[start:end]
+            start = end + 1
+    
+    def _decode_lines(self, raw_lines: Iterable[bytes]) -> Iterator[str]:
+        # Same line breaks as a text-mode read: '\r\n' and a lone '\r' both end a line
+        for raw_line in raw_lines:
+            line = raw_line.decode('utf-8')
+            if '\r' in line:
+                yield from line.split('\r')
+            else:
+                yield line
\ No newline at end of file
@@ -0,0 +1,105 @@
+import cProfile
+import itertools
+import logging
+import os
+import re
+import threading
+import tracemalloc
+import uuid
+from typing import Callable, Mapping, Optional, Tuple
+from ...domain.interfaces.parser import DocumentExtractor, DocumentTemplateParser, OCRDataParser
+from ...domain.models.output import ExtractionResult
+from ...domain.models.timings import StageTimings
+from ..factory.document_extractor_factory import ExtractionRequest, run_timed_document_extraction
+
+
+PROFILE_HEADER = "x-profile"
+REQUEST_ID_HEADER = "x-request-id"
+TOP_ALLOCATION_SITES = 25
+TRACEMALLOC_FRAMES = 10
+
+# tracemalloc is process-wide, so only one extraction per process is profiled at a time
+_profiling_lock = threading.Lock()
+
+
+class RequestProfiler:
+    def __init__(self, output_directory: str, sample_every: int = 0, allow_header: bool = True):
+        self.output_directory = output_directory
+        self.sample_every = sample_every
+        self.allow_header = allow_header
+        self._counter = itertools.count(1)
+    
+    def select_profile_id(self, headers: Mapping[str, str]) -> Optional[str]:
+        requested = self.allow_header and headers.get(PROFILE_HEADER, "").strip().lower() in ("1", "true", "yes")
+        sampled = self.sample_every > 0 and next(self._counter) % self.sample_every == 0
+        if not (requested or sampled):
+            return None
+        return create_profile_id(headers.get(REQUEST_ID_HEADER))
+
+
+def create_profile_id(request_id: Optional[str]) -> str:
+    # The id becomes a file name, so only a safe subset of the client's request id is kept
+    if request_id:
+        safe_id = re.sub(r'[^A-Za-z0-9._-]', '_', request_id.strip())[:64].lstrip('.')
+        if safe_id:
+            return safe_id
+    return uuid.uuid4().hex
+
+
+def run_profiled_document_extraction(
+    output_directory: str,
+    profile_id: str,
+    extractor_factory: Callable[..., DocumentExtractor],
+    template_parser: DocumentTemplateParser,
+    ocr_parser: OCRDataParser,
+    request: ExtractionRequest
+) -> Tuple[ExtractionResult, StageTimings, bool]:
+    # The flag reports whether a profile was written; it is not while another request holds the profiler
+    if not _profiling_lock.acquire(blocking=False):
+        return (*run_timed_document_extraction(extractor_factory, template_parser, ocr_parser, request), False)
+    
+    try:
+        profiler = cProfile.Profile()
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+        try:
+            profiler.enable()
+            try:
+                outcome = run_timed_document_extraction(extractor_factory, template_parser, ocr_parser, request)
+            finally:
+                profiler.disable()
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        
+        # The extraction already succeeded, so a profile that cannot be written only costs the profile
+        try:
+            write_profile(output_directory, profile_id, profiler, snapshot, peak)
+        except OSError as e:
+            logging.warning(f"Could not write profile {profile_id} to {output_directory}: {e}")
+            return (*outcome, False)
+        return (*outcome, True)
+    finally:
+        _profiling_lock.release()
+
+
+def write_profile(
+    output_directory: str,
+    profile_id: str,
+    profiler: cProfile.Profile,
+    snapshot: tracemalloc.Snapshot,
+    peak: int
+) -> None:
+    os.makedirs(output_directory, exist_ok=True)
+    base_path = os.path.join(output_directory, profile_id)
+    profiler.dump_stats(f"{base_path}.pstats")
+    
+    snapshot = snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, cProfile.__file__)
+    ])
+    with open(f"{base_path}.allocations.txt", "w") as f:
+        f.write(f"peak traced memory: {peak} bytes\n")
+        f.write(f"top {TOP_ALLOCATION_SITES} allocation sites by size:\n")
+        for statistic in snapshot.statistics('lineno')[:TOP_ALLOCATION_SITES]:
+            f.write(f"{statistic}\n")
\ No newline at end of file
@@ -0,0 +1,117 @@
+import json
+from json.encoder import encode_basestring
+from typing import Any, Dict, Iterable, List, Tuple
+from ...domain.models.output import DocumentHeader, ExtractionResult, OrderedFieldMap
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the standard json module is used without it
+    orjson = None
+
+
+JSON_MEDIA_TYPE = "application/json"
+COMPACT_MEDIA_TYPE = "application/vnd.ocr-extractor.compact+json"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def encode_json(content: Any) -> bytes:
+    # Same output shape as JSONResponse: compact separators and raw non-ASCII text
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def encode_extraction_result(result: ExtractionResult, compact: bool = False) -> bytes:
+    if compact:
+        return _encode_compact(result)
+    if orjson is not None:
+        return orjson.dumps(result.to_dict())
+    return _write_result(result).encode("utf-8")
+
+
+def decode_extraction_result(data: bytes) -> ExtractionResult:
+    # Inverse of the default JSON encoding; lines with the same keys share one key tuple
+    content = orjson.loads(data) if orjson is not None else json.loads(data)
+    shared_keys: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+    lines = []
+    for values in content["lines"]:
+        keys = tuple(values)
+        lines.append(OrderedFieldMap(keys=shared_keys.setdefault(keys, keys), values=values))
+    return ExtractionResult(header=DocumentHeader(**content["header"]), lines=lines)
+
+
+def encode_ndjson_header(header: DocumentHeader) -> bytes:
+    return encode_json({"header": header.to_dict()}) + b"\n"
+
+
+def encode_ndjson_lines(lines: Iterable[OrderedFieldMap]) -> bytes:
+    # One JSON object per line, each terminated by a newline; empty input gives empty output
+    if orjson is not None:
+        return b"".join([orjson.dumps(line.to_dict(), option=orjson.OPT_APPEND_NEWLINE) for line in lines])
+    return "".join([encoded + "\n" for encoded in _write_lines(lines)]).encode("utf-8")
+
+
+def get_compact_columns(lines: List[OrderedFieldMap]) -> List[str]:
+    # Lines normally share one key list; any extra keys are appended in first-seen order
+    columns = {}
+    seen = set()
+    for line in lines:
+        line_keys = tuple(line.keys)
+        if line_keys in seen:
+            continue
+        seen.add(line_keys)
+        columns.update(dict.fromkeys(line_keys))
+    return list(columns)
+
+
+def _encode_compact(result: ExtractionResult) -> bytes:
+    columns = get_compact_columns(result.lines)
+    if orjson is not None:
+        return orjson.dumps({
+            "header": result.header.to_dict(),
+            "columns": columns,
+            "lines": [[line.values.get(key) for key in columns] for line in result.lines]
+        })
+    
+    parts = ['{"header":', _write_object(result.header.to_dict()), ',"columns":[']
+    parts.append(",".join([encode_basestring(key) for key in columns]))
+    parts.append('],"lines":[')
+    parts.append(",".join([
+        "[" + ",".join([_write_value(line.values.get(key)) for key in columns]) + "]"
+        for line in result.lines
+    ]))
+    parts.append("]}")
+    return "".join(parts).encode("utf-8")
+
+
+def _write_result(result: ExtractionResult) -> str:
+    # Writes the to_dict() layout straight from the models without building per-line dicts
+    return '{"header":' + _write_object(result.header.to_dict()) + ',"lines":[' + ",".join(_write_lines(result.lines)) + "]}"
+
+
+def _write_lines(lines: Iterable[OrderedFieldMap]) -> List[str]:
+    # The encoded '"key":' prefixes are shared by every line with the same key list
+    prefixes_by_keys: Dict[Tuple[str, ...], List[Tuple[str, str]]] = {}
+    encoded_lines = []
+    for line in lines:
+        line_keys = tuple(line.keys)
+        prefixes = prefixes_by_keys.get(line_keys)
+        if prefixes is None:
+            prefixes = prefixes_by_keys[line_keys] = [
+                (key, encode_basestring(key) + ":") for key in dict.fromkeys(line_keys)
+            ]
+        values = line.values
+        encoded_lines.append("{" + ",".join([prefix + _write_value(values.get(key)) for key, prefix in prefixes]) + "}")
+    return encoded_lines
+
+
+def _write_object(content: Dict[str, Any]) -> str:
+    return "{" + ",".join([encode_basestring(key) + ":" + _write_value(value) for key, value in content.items()]) + "}"
+
+
+def _write_value(value: Any) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, str):
+        return encode_basestring(value)
+    return json.dumps(value, ensure_ascii=False, allow_nan=False)
\ No newline at end of file
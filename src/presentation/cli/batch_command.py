@@ -0,0 +1,152 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, TextIO, Tuple
+from ...domain.models.timings import StageTimings
+from ...infrastructure.factory.batch_extractor_pool import extract_batch_line
+from ...infrastructure.factory.document_extractor_factory import ExtractionRequest
+
+
+MAX_AUTO_CHUNKSIZE = 64
+CHUNKS_PER_WORKER = 4
+PATH_FIELDS = ('llm_res_txt', 'new_ocr_coord_json')
+
+
+class BatchInputError(Exception):
+    pass
+
+
+def load_manifest(manifest_path: str) -> List[Tuple[str, ExtractionRequest]]:
+    # One JSON object per line with the same fields as /extract-files; relative paths resolve against the manifest
+    base_directory = Path(manifest_path).resolve().parent
+    items = []
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                payload = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise BatchInputError(f"{manifest_path}:{line_number}: invalid JSON: {e}")
+            
+            if isinstance(payload, dict):
+                for field in PATH_FIELDS:
+                    path = payload.get(field)
+                    if isinstance(path, str) and path and not os.path.isabs(path):
+                        payload[field] = str(base_directory / path)
+            
+            request = ExtractionRequest.from_payload(payload)
+            if request is None:
+                raise BatchInputError(f"{manifest_path}:{line_number}: missing template or OCR input")
+            items.append((str(payload.get('id', line_number)), request))
+    return items
+
+
+def discover_pairs(directory: str, template_suffix: str = '.json', ocr_suffix: str = '.txt') -> List[Tuple[str, ExtractionRequest]]:
+    # Pairs <name><template_suffix> with <name><ocr_suffix>; templates without OCR data are skipped
+    items = []
+    for template_path in sorted(Path(directory).glob(f"*{template_suffix}")):
+        name = template_path.name[:-len(template_suffix)]
+        ocr_path = template_path.with_name(name + ocr_suffix)
+        if ocr_path.is_file():
+            items.append((name, ExtractionRequest(llm_res_txt=str(template_path), new_ocr_coord_json=str(ocr_path))))
+    return items
+
+
+def choose_chunksize(item_count: int, workers: int) -> int:
+    # A few chunks per worker keeps the pool balanced while amortizing the pickling round trips
+    return max(1, min(MAX_AUTO_CHUNKSIZE, item_count // (workers * CHUNKS_PER_WORKER)))
+
+
+class StageSummary:
+    def __init__(self):
+        self.durations: Dict[str, List[float]] = {}
+        self.documents = 0
+        self.failures = 0
+    
+    def record(self, status: int, timings: StageTimings) -> None:
+        self.documents += 1
+        if status != 200:
+            self.failures += 1
+        for stage, seconds in timings.durations:
+            self.durations.setdefault(stage, []).append(seconds)
+    
+    def write(self, elapsed: float, out: TextIO) -> None:
+        throughput = self.documents / elapsed if elapsed > 0 else 0.0
+        out.write(f"{self.documents} documents ({self.failures} failed) in {elapsed:.3f}s: {throughput:.1f} docs/sec\n")
+        out.write(f"{'stage':>14} {'count':>8} {'mean (ms)':>10} {'p95 (ms)':>10} {'total (s)':>10}\n")
+        for stage, durations in self.durations.items():
+            ordered = sorted(durations)
+            p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+            total = sum(ordered)
+            out.write(
+                f"{stage:>14} {len(ordered):>8} {total / len(ordered) * 1000:>10.3f} "
+                f"{p95 * 1000:>10.3f} {total:>10.3f}\n"
+            )
+
+
+def run_batch(
+    items: List[Tuple[str, ExtractionRequest]],
+    output: TextIO,
+    workers: Optional[int] = None,
+    chunksize: Optional[int] = None
+) -> StageSummary:
+    workers = workers or os.cpu_count() or 1
+    chunksize = chunksize or choose_chunksize(len(items), workers)
+    summary = StageSummary()
+    
+    # map() keeps input order, so the output lines follow the manifest
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        item_ids = [item_id for item_id, _ in items]
+        requests = [request for _, request in items]
+        for status, line, timings in pool.map(extract_batch_line, item_ids, requests, chunksize=chunksize):
+            output.write(line)
+            output.write('\n')
+            summary.record(status, timings)
+    return summary
+
+
+def positive_int(value: str) -> int:
+    # argparse turns the ValueError into a usage error naming the option
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value}")
+    return number
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Extract a batch of documents offline and write the results as JSON Lines")
+    parser.add_argument("source", help="JSON Lines manifest or a directory of template/OCR pairs")
+    parser.add_argument("-o", "--output", default="-", help="JSON Lines output path (default: stdout)")
+    parser.add_argument("--workers", type=positive_int, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunksize", type=positive_int, help="documents sent to a worker at a time (default: automatic)")
+    parser.add_argument("--template-suffix", default=".json", help="template file suffix in directory mode")
+    parser.add_argument("--ocr-suffix", default=".txt", help="OCR file suffix in directory mode")
+    args = parser.parse_args(argv)
+    
+    try:
+        if os.path.isdir(args.source):
+            items = discover_pairs(args.source, args.template_suffix, args.ocr_suffix)
+        else:
+            items = load_manifest(args.source)
+    except (OSError, BatchInputError) as e:
+        sys.stderr.write(f"error: {e}\n")
+        return 2
+    
+    started = time.perf_counter()
+    if args.output == "-":
+        summary = run_batch(items, sys.stdout, args.workers, args.chunksize)
+    else:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            summary = run_batch(items, output, args.workers, args.chunksize)
+    
+    summary.write(time.perf_counter() - started, sys.stderr)
+    return 1 if summary.failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,56 @@
+import asyncio
+from typing import Any, Dict
+from fastapi import HTTPException
+from fastapi.responses import Response
+from ...infrastructure.factory.batch_extractor_pool import BatchExtractorPool
+from ...infrastructure.factory.document_extractor_factory import ExtractionRequest
+from ...infrastructure.serialization.result_encoder import encode_json
+from .extraction_handler import MISSING_INPUTS_DETAIL
+
+
+class BatchExtractionHandler:
+    def __init__(self, batch_pool: BatchExtractorPool):
+        self.batch_pool = batch_pool
+    
+    async def handle_extract_batch(self, request_data: dict) -> Response:
+        items = request_data.get('items')
+        if not isinstance(items, list) or not items:
+            raise HTTPException(
+                status_code=400,
+                detail="items must be a non-empty list of template/OCR pairs"
+            )
+        
+        try:
+            # Fan valid items out over the process pool; results are reassembled in input order.
+            # An item the pool refuses fails on its own, the rest of the batch still runs
+            pending = {}
+            completed = {}
+            for index, item in enumerate(items):
+                extraction_request = ExtractionRequest.from_payload(item)
+                if extraction_request is None:
+                    continue
+                try:
+                    pending[index] = asyncio.wrap_future(self.batch_pool.submit(extraction_request))
+                except Exception as e:
+                    completed[index] = e
+            
+            outcomes = await asyncio.gather(*pending.values(), return_exceptions=True)
+            completed.update(zip(pending.keys(), outcomes))
+            
+            results = [self._build_item_result(completed, index) for index in range(len(items))]
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+        
+        return Response(
+            content=encode_json({"results": results}),
+            headers={"Content-Type": "application/json; charset=utf-8"}
+        )
+    
+    def _build_item_result(self, completed: Dict[int, Any], index: int) -> Dict[str, Any]:
+        if index not in completed:
+            return {"status": 400, "error": MISSING_INPUTS_DETAIL}
+        
+        outcome = completed[index]
+        if isinstance(outcome, BaseException):
+            return {"status": 500, "error": f"Internal server error: {str(outcome)}"}
+        return outcome
@@ -1,9 +1,33 @@
+import asyncio
+import contextlib
 import json
-from typing import Callable
+import time
+from itertools import islice
+from typing import AsyncIterator, Awaitable, Callable, Iterator, Optional, Tuple
 from fastapi import HTTPException, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import Response, StreamingResponse
 from ...domain.interfaces.parser import DocumentTemplateParser, OCRDataParser, DocumentExtractor
-from ...infrastructure.factory.document_extractor_factory import ExtractionRequest
+from ...domain.models.timings import StageTimings, time_stage
+from ...infrastructure.caching.result_cache import ResultCache
+from ...infrastructure.concurrency.bounded_executor import BoundedExecutor, ExecutorSaturatedError
+from ...infrastructure.factory.document_extractor_factory import (
+    ExtractionRequest, ExtractionSetupError, run_document_extraction, run_document_extraction_async,
+    run_timed_document_extraction, start_document_extraction_stream
+)
+from ...infrastructure.metrics.extraction_metrics import MetricsRegistry
+from ...infrastructure.profiling.request_profiler import RequestProfiler, run_profiled_document_extraction
+from ...infrastructure.serialization.result_encoder import (
+    COMPACT_MEDIA_TYPE, JSON_MEDIA_TYPE, NDJSON_MEDIA_TYPE,
+    encode_extraction_result, encode_ndjson_header, encode_ndjson_lines
+)
+from ...domain.models.output import DocumentHeader, ExtractionResult, OrderedFieldMap
+
+
+MISSING_INPUTS_DETAIL = (
+    "llm_res_txt or llm_res_content and new_ocr_coord_json or new_ocr_coord_content are required"
+)
+REQUEST_FIELDS = ('llm_res_txt', 'new_ocr_coord_json', 'llm_res_content', 'new_ocr_coord_content')
+STREAM_CHUNK_LINES = 64
 
 
 class ExtractionHandler:
@@ -11,52 +35,286 @@ class ExtractionHandler:
         self, 
         template_parser: DocumentTemplateParser,
         ocr_parser: OCRDataParser,
-        extractor_factory: Callable[[DocumentTemplateParser, OCRDataParser, ExtractionRequest], DocumentExtractor]
+        extractor_factory: Callable[..., DocumentExtractor],
+        extraction_executor: BoundedExecutor,
+        async_extractor_factory: Optional[Callable[..., Awaitable[DocumentExtractor]]] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        profiler: Optional[RequestProfiler] = None,
+        result_cache: Optional[ResultCache] = None
     ):
         self.template_parser = template_parser
         self.ocr_parser = ocr_parser
         self.document_extractor = extractor_factory
+        self.async_document_extractor = async_extractor_factory
+        self.extraction_executor = extraction_executor
+        self.metrics = metrics
+        self.profiler = profiler
+        self.result_cache = result_cache
+    
+    async def handle_extract_request(self, request: Request) -> Response:
+        content_type = request.headers.get('content-type', '')
+        
+        try:
+            if content_type.startswith(('multipart/form-data', 'application/x-www-form-urlencoded')):
+                request_data = await self._read_form_fields(request)
+            else:
+                request_data = await request.json()
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"invalid request body: {str(e)}")
+        
+        profile_id = self.profiler.select_profile_id(request.headers) if self.profiler is not None else None
+        return await self.handle_extract_files(request_data, self._negotiate_media_type(request), profile_id)
     
-    async def handle_extract_files(self, request_data: dict) -> JSONResponse:
+    async def handle_extract_files(
+        self,
+        request_data: dict,
+        media_type: str = JSON_MEDIA_TYPE,
+        profile_id: Optional[str] = None
+    ) -> Response:
+        started = time.perf_counter()
         try:
-            # Validate required fields
-            if 'llm_res_txt' not in request_data or 'new_ocr_coord_json' not in request_data:
+            # Validate required fields: each input is a file path or inline content
+            extraction_request = ExtractionRequest.from_payload(request_data)
+            if extraction_request is None:
                 raise HTTPException(
                     status_code=400, 
-                    detail="llm_res_txt and new_ocr_coord_json are required file paths"
+                    detail=MISSING_INPUTS_DETAIL
                 )
             
-            extraction_request = ExtractionRequest(
-                llm_res_txt=request_data['llm_res_txt'],
-                new_ocr_coord_json=request_data['new_ocr_coord_json']
-            )
+            # Byte-identical inputs are answered from the result cache; profiled requests always run the pipeline
+            cache_key, cached_result = None, None
+            if self.result_cache is not None and profile_id is None:
+                cache_key, cached_result = await self._lookup_cached_result(extraction_request)
             
-            # Create document extractor
+            # Create document extractor and extract document off the event loop
             try:
-                extractor = self.document_extractor(
-                    self.template_parser, 
-                    self.ocr_parser, 
-                    extraction_request
+                if media_type == NDJSON_MEDIA_TYPE:
+                    return await self._stream_extraction(extraction_request, started, cached_result)
+                if cached_result is not None:
+                    result, timings = cached_result, self._create_timings()
+                elif profile_id is not None:
+                    result, timings, profile_written = await self._run_profiled_extraction(extraction_request, profile_id)
+                    if not profile_written:
+                        profile_id = None
+                else:
+                    result, timings = await self._run_extraction(extraction_request)
+                    if cache_key is not None:
+                        await self._store_cached_result(cache_key, result)
+            except ExecutorSaturatedError as e:
+                raise HTTPException(
+                    status_code=503,
+                    detail="extraction queue is full, retry later",
+                    headers={"Retry-After": str(e.retry_after_seconds)}
                 )
-            except Exception as e:
+            except ExtractionSetupError as e:
                 raise HTTPException(
                     status_code=400,
                     detail=f"extraction setup failed: {str(e)}"
                 )
             
-            # Extract document
-            result = extractor.extract_document()
-            
-            return JSONResponse(
-                content=result.to_dict(),
-                headers={"Content-Type": "application/json; charset=utf-8"}
-            )
+            with time_stage(timings, "serialize"):
+                content = encode_extraction_result(result, compact=media_type == COMPACT_MEDIA_TYPE)
+            self._record_timings(timings, started)
             
+            headers = {"Content-Type": f"{media_type}; charset=utf-8", "Vary": "Accept"}
+            if profile_id is not None:
+                headers["X-Profile-Id"] = profile_id
+            return Response(content=content, headers=headers)
+        
         except HTTPException:
             raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
     
+    async def _lookup_cached_result(self, extraction_request: ExtractionRequest) -> Tuple[Optional[str], Optional[ExtractionResult]]:
+        # Hashing reads file inputs, so it runs on a thread rather than the event loop
+        loop = asyncio.get_running_loop()
+        cache_key = await loop.run_in_executor(None, self.result_cache.compute_key, extraction_request)
+        if cache_key is None:
+            return None, None
+        return cache_key, await loop.run_in_executor(None, self.result_cache.get, cache_key)
+    
+    async def _store_cached_result(self, cache_key: str, result: ExtractionResult) -> None:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.result_cache.put, cache_key, result)
+    
+    async def _run_extraction(self, extraction_request: ExtractionRequest) -> Tuple[ExtractionResult, Optional[StageTimings]]:
+        # The async factory loads both inputs concurrently on the executor's threads
+        if self.async_document_extractor is not None:
+            timings = self._create_timings()
+            result = await self.extraction_executor.run_async(
+                run_document_extraction_async,
+                self.async_document_extractor,
+                self.template_parser,
+                self.ocr_parser,
+                extraction_request,
+                self.extraction_executor.executor,
+                timings
+            )
+            return result, timings
+        
+        if self.metrics is None:
+            result = await self.extraction_executor.run(
+                run_document_extraction,
+                self.document_extractor,
+                self.template_parser, 
+                self.ocr_parser, 
+                extraction_request
+            )
+            return result, None
+        
+        return await self.extraction_executor.run(
+            run_timed_document_extraction,
+            self.document_extractor,
+            self.template_parser,
+            self.ocr_parser,
+            extraction_request
+        )
+    
+    async def _run_profiled_extraction(
+        self,
+        extraction_request: ExtractionRequest,
+        profile_id: str
+    ) -> Tuple[ExtractionResult, Optional[StageTimings], bool]:
+        # The whole extraction runs in one worker so a single profiler sees every stage
+        result, timings, profile_written = await self.extraction_executor.run(
+            run_profiled_document_extraction,
+            self.profiler.output_directory,
+            profile_id,
+            self.document_extractor,
+            self.template_parser,
+            self.ocr_parser,
+            extraction_request
+        )
+        return result, timings if self.metrics is not None else None, profile_written
+    
+    async def _stream_extraction(
+        self,
+        extraction_request: ExtractionRequest,
+        started: float,
+        cached_result: Optional[ExtractionResult] = None
+    ) -> StreamingResponse:
+        reservation = contextlib.AsyncExitStack()
+        if cached_result is not None:
+            # A cached result needs no extraction slot
+            return StreamingResponse(
+                self._stream_chunks(reservation, cached_result.header, iter(cached_result.lines), self._create_timings(), started),
+                headers={"Content-Type": f"{NDJSON_MEDIA_TYPE}; charset=utf-8", "Vary": "Accept"}
+            )
+        
+        # The executor slot is held until the last line is sent, so streams count against the same limits
+        await reservation.enter_async_context(self.extraction_executor.reserve())
+        try:
+            header, lines, timings = await self._start_stream(extraction_request)
+        except BaseException:
+            await reservation.aclose()
+            raise
+        
+        return StreamingResponse(
+            self._stream_chunks(reservation, header, lines, timings, started),
+            headers={"Content-Type": f"{NDJSON_MEDIA_TYPE}; charset=utf-8", "Vary": "Accept"}
+        )
+    
+    async def _start_stream(
+        self,
+        extraction_request: ExtractionRequest
+    ) -> Tuple[DocumentHeader, Iterator[OrderedFieldMap], Optional[StageTimings]]:
+        if self.async_document_extractor is not None:
+            timings = self._create_timings()
+            header, lines = await start_document_extraction_stream(
+                self.async_document_extractor,
+                self.template_parser,
+                self.ocr_parser,
+                extraction_request,
+                self.extraction_executor.executor,
+                timings
+            )
+            return header, lines, timings
+        
+        # A generator cannot leave a worker process, so process mode streams a finished result
+        loop = asyncio.get_running_loop()
+        if self.metrics is None:
+            result = await loop.run_in_executor(
+                self.extraction_executor.executor,
+                run_document_extraction,
+                self.document_extractor,
+                self.template_parser,
+                self.ocr_parser,
+                extraction_request
+            )
+            return result.header, iter(result.lines), None
+        
+        result, timings = await loop.run_in_executor(
+            self.extraction_executor.executor,
+            run_timed_document_extraction,
+            self.document_extractor,
+            self.template_parser,
+            self.ocr_parser,
+            extraction_request
+        )
+        return result.header, iter(result.lines), timings
+    
+    async def _stream_chunks(
+        self,
+        reservation: contextlib.AsyncExitStack,
+        header: DocumentHeader,
+        lines: Iterator[OrderedFieldMap],
+        timings: Optional[StageTimings],
+        started: float
+    ) -> AsyncIterator[bytes]:
+        # Header record first, then the lines in chunks produced on the extraction threads
+        chunk_executor = self.extraction_executor.executor if self.async_document_extractor is not None else None
+        loop = asyncio.get_running_loop()
+        line_count = 0
+        stream_seconds = 0.0
+        try:
+            yield encode_ndjson_header(header)
+            while True:
+                chunk_started = time.perf_counter()
+                chunk = await loop.run_in_executor(chunk_executor, encode_ndjson_lines, islice(lines, STREAM_CHUNK_LINES))
+                stream_seconds += time.perf_counter() - chunk_started
+                if not chunk:
+                    break
+                # Every NDJSON record ends with the only raw newline it contains
+                line_count += chunk.count(b"\n")
+                yield chunk
+            
+            if timings is not None:
+                timings.add("stream", stream_seconds)
+                timings.line_count = line_count
+                self._record_timings(timings, started)
+        finally:
+            await reservation.aclose()
+    
+    def _create_timings(self) -> Optional[StageTimings]:
+        return StageTimings() if self.metrics is not None else None
+    
+    def _record_timings(self, timings: Optional[StageTimings], started: float) -> None:
+        if timings is None:
+            return
+        timings.add("total", time.perf_counter() - started)
+        self.metrics.record(timings)
+    
+    def _negotiate_media_type(self, request: Request) -> str:
+        accept = request.headers.get('accept', '')
+        if NDJSON_MEDIA_TYPE in accept:
+            return NDJSON_MEDIA_TYPE
+        if COMPACT_MEDIA_TYPE in accept:
+            return COMPACT_MEDIA_TYPE
+        return JSON_MEDIA_TYPE
+    
+    async def _read_form_fields(self, request: Request) -> dict:
+        form = await request.form()
+        request_data = {}
+        for field in REQUEST_FIELDS:
+            value = form.get(field)
+            if value is None:
+                continue
+            if hasattr(value, 'read'):
+                value = await value.read()
+            request_data[field] = value
+        return request_data
+    
     def _escape_error(self, error: Exception) -> str:
         error_message = str(error)
         try:
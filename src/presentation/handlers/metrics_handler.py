@@ -0,0 +1,21 @@
+from typing import Optional
+from fastapi import HTTPException
+from fastapi.responses import Response
+from ...infrastructure.metrics.extraction_metrics import MetricsRegistry
+
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class MetricsHandler:
+    def __init__(self, metrics: Optional[MetricsRegistry]):
+        self.metrics = metrics
+    
+    async def handle_metrics(self) -> Response:
+        if self.metrics is None:
+            raise HTTPException(status_code=404, detail="metrics are disabled")
+        
+        return Response(
+            content=self.metrics.render_prometheus(),
+            headers={"Content-Type": PROMETHEUS_CONTENT_TYPE}
+        )
\ No newline at end of file
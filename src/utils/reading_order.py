@@ -0,0 +1,88 @@
+from array import array
+from typing import Iterator, List
+from ..domain.models.token_table import TokenTable, numpy
+
+
+BATCH_CLUSTERING_MIN_TOKENS = 1000
+# Relative margin that keeps batched row decisions clear of float rounding in the running mean
+BATCH_CLUSTERING_MARGIN = 1e-9
+
+
+def sort_indices_by_y(tokens: TokenTable) -> List[int]:
+    return sorted(range(len(tokens)), key=tokens.mid_y.__getitem__)
+
+
+def cluster_sorted_rows(sorted_tokens: List[int], tokens: TokenTable, row_tolerance: float) -> List[List[int]]:
+    return list(iter_sorted_rows(sorted_tokens, tokens, row_tolerance))
+
+
+def iter_sorted_rows(sorted_tokens: List[int], tokens: TokenTable, row_tolerance: float) -> Iterator[List[int]]:
+    # Rows are yielded top to bottom as soon as they are closed
+    if not sorted_tokens:
+        return iter(())
+    
+    if len(sorted_tokens) >= BATCH_CLUSTERING_MIN_TOKENS:
+        return _cluster_sorted_rows_batched(sorted_tokens, tokens, row_tolerance)
+    return _cluster_sorted_rows_sequential(sorted_tokens, tokens, row_tolerance)
+
+
+def compute_reading_rank(tokens: TokenTable, y_order: List[int], row_tolerance: float) -> array:
+    # Reading order is (row, x0): rows come from the running-mean clustering over the whole
+    # document, so ordering any subset of tokens is a single key sort on the rank
+    row_ids = array('l', [0]) * len(tokens)
+    for row_id, row in enumerate(cluster_sorted_rows(y_order, tokens, row_tolerance)):
+        for token in row:
+            row_ids[token] = row_id
+    
+    x0 = tokens.x0
+    reading_order = sorted(range(len(tokens)), key=lambda token: (row_ids[token], x0[token]))
+    
+    rank = array('l', [0]) * len(tokens)
+    for position, token in enumerate(reading_order):
+        rank[token] = position
+    return rank
+
+
+def _cluster_sorted_rows_sequential(sorted_tokens: List[int], tokens: TokenTable, row_tolerance: float) -> Iterator[List[int]]:
+    mid_y = tokens.mid_y
+    current_row = [sorted_tokens[0]]
+    average_y = mid_y[sorted_tokens[0]]
+    
+    for token in sorted_tokens[1:]:
+        token_y = mid_y[token]
+        
+        if abs(token_y - average_y) <= row_tolerance:
+            current_row.append(token)
+            average_y = (average_y * (len(current_row) - 1) + token_y) / len(current_row)
+        else:
+            yield current_row
+            current_row = [token]
+            average_y = token_y
+    
+    yield current_row
+
+
+def _cluster_sorted_rows_batched(sorted_tokens: List[int], tokens: TokenTable, row_tolerance: float) -> Iterator[List[int]]:
+    # The running mean of a y-sorted row never drops below its first token, so a gap
+    # wider than the tolerance always starts a new row and a segment spanning less
+    # than the tolerance is always one row. Only the remaining segments need the
+    # sequential running-mean walk, which keeps the output identical.
+    break_gap = row_tolerance * (1 + BATCH_CLUSTERING_MARGIN)
+    single_row_span = row_tolerance * (1 - BATCH_CLUSTERING_MARGIN)
+    
+    if numpy is not None:
+        sorted_y_vector = tokens.vector(tokens.mid_y)[numpy.asarray(sorted_tokens, dtype=numpy.intp)]
+        breaks = (numpy.flatnonzero(numpy.diff(sorted_y_vector) > break_gap) + 1).tolist()
+        sorted_y = sorted_y_vector.tolist()
+    else:
+        mid_y = tokens.mid_y
+        sorted_y = [mid_y[token] for token in sorted_tokens]
+        breaks = [i for i in range(1, len(sorted_y)) if sorted_y[i] - sorted_y[i - 1] > break_gap]
+    
+    start = 0
+    for end in breaks + [len(sorted_tokens)]:
+        if sorted_y[end - 1] - sorted_y[start] <= single_row_span:
+            yield sorted_tokens[start:end]
+        else:
+            yield from _cluster_sorted_rows_sequential(sorted_tokens[start:end], tokens, row_tolerance)
+        start = end
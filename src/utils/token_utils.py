@@ -1,54 +1,37 @@
-import math
+from itertools import islice
 from typing import List, Optional
-from ..domain.models.document import OCRToken
 
 
-def sort_tokens_by_x(tokens: List[OCRToken]) -> None:
-    sort_tokens_by_x_with_tolerance(tokens, 0.01)
+TIGHT_CHARACTERS = frozenset([",", ".", ":", ";", ")", "]", "%"])
+ATTACHED_TEXTS = TIGHT_CHARACTERS | frozenset(["-", "/", "&"])
+OPENING_BRACKETS = frozenset(["(", "["])
 
 
-def sort_tokens_by_x_with_tolerance(tokens: List[OCRToken], row_tolerance: float) -> None:
-    def compare_tokens(token1: OCRToken, token2: OCRToken) -> bool:
-        y_diff = abs(token1.bounding_box.mid_y() - token2.bounding_box.mid_y())
-        
-        if y_diff < row_tolerance:
-            return token1.bounding_box.x0 < token2.bounding_box.x0
-        
-        return token1.bounding_box.mid_y() < token2.bounding_box.mid_y()
-    
-    from functools import cmp_to_key
-    tokens.sort(key=cmp_to_key(lambda a, b: -1 if compare_tokens(a, b) else 1))
-
-
-def join_tokens_smartly(tokens: List[OCRToken]) -> str:
-    if not tokens:
+def join_texts_smartly(texts: List[str]) -> str:
+    if not texts:
         return ""
     
-    def is_tight_character(text: str) -> bool:
-        return text in [",", ".", ":", ";", ")", "]", "%"]
+    # Track only the last emitted character so the join stays linear in the token count
+    result_parts = [texts[0]]
+    last_character = texts[0][-1:]
     
-    result_parts = []
-    
-    for i, token in enumerate(tokens):
-        text = token.text
-        if i == 0:
-            result_parts.append(text)
-            continue
-        
-        previous_text = "".join(result_parts)
-        
-        if (is_tight_character(text) or text in ["-", "/", "&"] or 
-            previous_text.endswith("(") or previous_text.endswith("[")):
+    for text in islice(texts, 1, None):
+        if text in ATTACHED_TEXTS or last_character in OPENING_BRACKETS:
             result_parts.append(text)
+            if text:
+                last_character = text[-1]
         else:
             result_parts.append(" ")
             result_parts.append(text)
+            last_character = text[-1] if text else " "
     
     result = "".join(result_parts)
-    result = result.replace("$ ", "$")
-    result = result.replace(" - ", "-")
+    if "$ " in result:
+        result = result.replace("$ ", "$")
+    if " - " in result:
+        result = result.replace(" - ", "-")
     return result.strip()
 
 
 def create_string_pointer(value: str) -> Optional[str]:
-    return value.strip() if value.strip() else None
\ No newline at end of file
+    return value.strip() if value.strip() else None